@@ -1,82 +1,103 @@
-from fastapi import Depends, HTTPException, status, Header, APIRouter, Response
+import os
+from fastapi import Depends, HTTPException, status, APIRouter, Response
+from fastapi.responses import StreamingResponse, FileResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_, or_, select, tuple_, union_all, update
 from typing import List, Optional
-from datetime import datetime, timedelta
-import csv
-import io
-import json
-from app.core.security import decode_access_token
-from app.db.session import SessionLocal
-from app.models import User, Skill, Swap, Rating, PlatformMessage
+from datetime import date, datetime, timedelta
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.auth import get_current_user
+from app.core.config import settings
+from app.core.profiling import list_profiles, profile_path
+from app.db.engine import pool_status
+from app.db.session import engine, get_db, replica_engines
+from app.models.skill import SkillStatus
+from app.services.admin_loader import AdminLoader
+from app.services.admin_stats import get_platform_stats
+from app.services import bans
+from app.services.counters import adjust_counters, status_change_deltas
+from app.services.moderation_queue import queue_page, claim_skills, release_claims
+from app.services.notifications import hub
+from app.services.platform_messages import invalidate_active_messages
+from app.services.rollups import METRICS, GRANULARITIES, complete_through, read_timeseries
+from app.services.report_jobs import enqueue_report_job, cancel_report_job, job_response
+from app.services.reports import REPORTS, WRITERS, MEDIA_TYPES, format_unavailable, report_filename, resolve_report_range, stream_report
+from app.models import User, Skill, Swap, Rating, PlatformMessage, UserRating, ReportJob
 from app.schemas.admin import (
     AdminUserResponse, AdminSkillResponse, AdminSwapResponse,
     BanUserRequest, UnbanUserRequest, RejectSkillRequest, ApproveSkillRequest,
-    PlatformMessageRequest, AdminStatsResponse, ReportRequest, AdminDashboardResponse
+    SkillBulkAction, SkillBulkRequest, SkillBulkItemResult, SkillBulkResponse,
+    ModerationQueueItem, ModerationClaimRequest, ModerationReleaseRequest,
+    PlatformMessageRequest, AdminStatsResponse, ReportRequest, ReportJobResponse, AdminDashboardResponse,
+    TimeSeriesResponse, RequestProfileResponse
 )
 
 admin_router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-def get_current_user(authorization: str = Header(None), db: Session = Depends(get_db)) -> User:
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing or invalid token")
-    token = authorization.split(" ")[1]
-    payload = decode_access_token(token)
-    if payload is None or "email" not in payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials"
-        )
-    user = db.query(User).filter(User.email == payload["email"]).first()
-    if user is None:
-        raise HTTPException(status_code=404, detail="User not found")
-    return user
-
 def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Admin access required")
     return current_user
 
+def _admin_skill_response(skill: Skill, user: User) -> AdminSkillResponse:
+    return AdminSkillResponse(
+        id=skill.id,
+        name=skill.name,
+        type=skill.type.value,
+        level=skill.level.value,
+        user_id=skill.user_id,
+        user_name=user.name,
+        user_email=user.email,
+        status=skill.status.value,
+        created_at=skill.created_at
+    )
+
+def _queue_item(skill: Skill, user: User) -> ModerationQueueItem:
+    return ModerationQueueItem(
+        **_admin_skill_response(skill, user).model_dump(),
+        moderation_priority=skill.moderation_priority,
+        moderation_reason=skill.moderation_reason,
+        claimed_by=skill.claimed_by,
+        claim_expires_at=skill.claim_expires_at
+    )
+
+def _admin_swap_response(swap: Swap, loader: AdminLoader) -> AdminSwapResponse:
+    return AdminSwapResponse(
+        id=swap.id,
+        from_user_id=swap.from_user_id,
+        to_user_id=swap.to_user_id,
+        skill_offered_id=swap.skill_offered_id,
+        skill_requested_id=swap.skill_requested_id,
+        status=swap.status,
+        from_user_name=loader.user_name(swap.from_user_id),
+        to_user_name=loader.user_name(swap.to_user_id),
+        skill_offered_name=loader.skill_name(swap.skill_offered_id),
+        skill_requested_name=loader.skill_name(swap.skill_requested_id),
+        created_at=swap.created_at,
+        updated_at=swap.updated_at
+    )
+
+def _admin_swap_responses(db: Session, swaps: List[Swap]) -> List[AdminSwapResponse]:
+    """Build swap rows with names resolved in two batched queries"""
+    loader = AdminLoader(db)
+    loader.load_for_swaps(swaps)
+    return [_admin_swap_response(swap, loader) for swap in swaps]
+
 @admin_router.get("/admin/dashboard", response_model=AdminDashboardResponse)
 def get_admin_dashboard(db: Session = Depends(get_db), _: User = Depends(get_admin_user)):
     """Get admin dashboard with stats and recent data"""
     
-    total_users = db.query(User).count()
-    active_users = db.query(User).filter(User.is_banned == False).count()
-    banned_users = db.query(User).filter(User.is_banned == True).count()
-    total_swaps = db.query(Swap).count()
-    pending_swaps = db.query(Swap).filter(Swap.status == "pending").count()
-    completed_swaps = db.query(Swap).filter(Swap.status == "completed").count()
-    total_skills = db.query(Skill).count()
-    pending_skills = db.query(Skill).filter(Skill.status == "pending").count()
-    total_ratings = db.query(Rating).count()
-    
-    avg_rating_result = db.query(func.avg(Rating.stars)).scalar()
-    average_rating = float(avg_rating_result) if avg_rating_result else 0.0
-    
-    stats = AdminStatsResponse(
-        total_users=total_users,
-        active_users=active_users,
-        banned_users=banned_users,
-        total_swaps=total_swaps,
-        pending_swaps=pending_swaps,
-        completed_swaps=completed_swaps,
-        total_skills=total_skills,
-        pending_skills=pending_skills,
-        total_ratings=total_ratings,
-        average_rating=average_rating
-    )
+    stats = get_platform_stats(db)
     
-    recent_users = db.query(User).order_by(User.created_at.desc()).limit(10).all()
-    recent_swaps = db.query(Swap).order_by(Swap.created_at.desc()).limit(10).all()
-    pending_skills_list = db.query(Skill).filter(Skill.status == "pending").limit(10).all()
+    recent_users = db.query(User).order_by(User.created_at.desc().nulls_last(), User.id.desc()).limit(10).all()
+    recent_swaps = _admin_swap_responses(
+        db, db.query(Swap).order_by(Swap.created_at.desc().nulls_last(), Swap.id.desc()).limit(10).all()
+    )
+    pending_skills_list = [
+        _admin_skill_response(skill, user)
+        for skill, user in db.query(Skill, User).join(User, User.id == Skill.user_id)
+        .filter(Skill.status == "pending").limit(10).all()
+    ]
     
     return AdminDashboardResponse(
         stats=stats,
@@ -85,36 +106,88 @@ def get_admin_dashboard(db: Session = Depends(get_db), _: User = Depends(get_adm
         pending_skills=pending_skills_list
     )
 
+# Sortable columns and the type of their cursor value
+ADMIN_USER_SORTS = {
+    "id": int, "name": str, "created_at": datetime, "total_swaps": int, "total_skills": int, "average_rating": float,
+}
+
 @admin_router.get("/admin/users", response_model=List[AdminUserResponse])
 def get_all_users(
+    response: Response,
     skip: int = 0, 
     limit: int = 100,
     status: Optional[str] = None,
+    sort_by: str = "id",
+    order: str = "asc",
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db), 
     _: User = Depends(get_admin_user)
 ):
-    """Get all users with filtering options"""
-    query = db.query(User)
+    """Get all users with filtering options.
+
+    Swap counts, skill counts and ratings come from grouped subqueries joined to
+    the page, so the whole page is one query. Pages can be walked with keyset
+    cursors: pass the `X-Next-Cursor` response header back as `cursor`.
+    """
+    if sort_by not in ADMIN_USER_SORTS or order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="Invalid sort")
+    
+    swap_participants = union_all(
+        select(Swap.from_user_id.label("user_id")),
+        select(Swap.to_user_id.label("user_id"))
+    ).subquery()
+    swap_counts = select(
+        swap_participants.c.user_id, func.count().label("total_swaps")
+    ).group_by(swap_participants.c.user_id).subquery()
+    skill_counts = select(
+        Skill.user_id, func.count(Skill.id).label("total_skills")
+    ).group_by(Skill.user_id).subquery()
+    
+    columns = {
+        "id": User.id,
+        "name": User.name,
+        "created_at": func.coalesce(User.created_at, datetime(1970, 1, 1)),
+        "total_swaps": func.coalesce(swap_counts.c.total_swaps, 0),
+        "total_skills": func.coalesce(skill_counts.c.total_skills, 0),
+        "average_rating": func.coalesce(UserRating.rating_sum * 1.0 / UserRating.rating_count, 0.0),
+    }
+    sort_column = columns[sort_by]
+    
+    query = db.query(User, columns["total_swaps"], columns["total_skills"], columns["average_rating"]) \
+        .outerjoin(swap_counts, swap_counts.c.user_id == User.id) \
+        .outerjoin(skill_counts, skill_counts.c.user_id == User.id) \
+        .outerjoin(UserRating, UserRating.user_id == User.id)
     
     if status == "banned":
         query = query.filter(User.is_banned == True)
     elif status == "active":
         query = query.filter(User.is_banned == False)
     
-    users = query.offset(skip).limit(limit).all()
-    
-    enhanced_users = []
-    for user in users:
-        total_swaps = db.query(Swap).filter(
-            or_(Swap.from_user_id == user.id, Swap.to_user_id == user.id)
-        ).count()
-        
-        total_skills = db.query(Skill).filter(Skill.user_id == user.id).count()
-        
-        avg_rating = db.query(func.avg(Rating.stars)).filter(Rating.to_user_id == user.id).scalar()
-        average_rating = float(avg_rating) if avg_rating else 0.0
-        
-        enhanced_users.append(AdminUserResponse(
+    if cursor:
+        last_value, last_id = decode_cursor(cursor, ADMIN_USER_SORTS[sort_by], int)
+        if order == "asc":
+            query = query.filter(or_(sort_column > last_value, and_(sort_column == last_value, User.id > last_id)))
+        else:
+            query = query.filter(or_(sort_column < last_value, and_(sort_column == last_value, User.id < last_id)))
+        skip = 0
+    
+    if order == "asc":
+        query = query.order_by(sort_column.asc(), User.id.asc())
+    else:
+        query = query.order_by(sort_column.desc(), User.id.desc())
+    
+    rows = query.offset(skip).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        user, total_swaps, total_skills, average_rating = rows[-1]
+        last_values = {"total_swaps": total_swaps, "total_skills": total_skills, "average_rating": average_rating}
+        last_value = last_values[sort_by] if sort_by in last_values else getattr(user, sort_by)
+        if sort_by == "created_at" and last_value is None:
+            last_value = datetime(1970, 1, 1)
+        response.headers["X-Next-Cursor"] = encode_cursor(last_value, user.id)
+    
+    return [
+        AdminUserResponse(
             id=user.id,
             name=user.name,
             email=user.email,
@@ -126,14 +199,14 @@ def get_all_users(
             last_login=user.last_login,
             total_swaps=total_swaps,
             total_skills=total_skills,
-            average_rating=average_rating
-        ))
-    
-    return enhanced_users
+            average_rating=float(average_rating)
+        )
+        for user, total_swaps, total_skills, average_rating in rows
+    ]
 
 @admin_router.post("/admin/users/ban")
 def ban_user(request: BanUserRequest, db: Session = Depends(get_db), _: User = Depends(get_admin_user)):
-    """Ban a user"""
+    """Ban a user, cancel their open swaps and revoke their sessions"""
     user = db.query(User).filter(User.id == request.user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -141,10 +214,12 @@ def ban_user(request: BanUserRequest, db: Session = Depends(get_db), _: User = D
     if user.is_admin:
         raise HTTPException(status_code=400, detail="Cannot ban admin users")
     
-    user.is_banned = True
-    db.commit()
+    cancelled = bans.ban_user(db, user)
     
-    return {"message": f"User {user.email} has been banned. Reason: {request.reason}"}
+    return {
+        "message": f"User {user.email} has been banned. Reason: {request.reason}",
+        "cancelled_swaps": cancelled
+    }
 
 @admin_router.post("/admin/users/unban")
 def unban_user(request: UnbanUserRequest, db: Session = Depends(get_db), _: User = Depends(get_admin_user)):
@@ -153,42 +228,91 @@ def unban_user(request: UnbanUserRequest, db: Session = Depends(get_db), _: User
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    user.is_banned = False
-    db.commit()
+    bans.unban_user(db, user)
     
     return {"message": f"User {user.email} has been unbanned"}
 
 @admin_router.get("/admin/skills", response_model=List[AdminSkillResponse])
 def get_all_skills(
+    response: Response,
     skip: int = 0, 
     limit: int = 100,
     status: Optional[str] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db), 
     _: User = Depends(get_admin_user)
 ):
-    """Get all skills with filtering options"""
-    query = db.query(Skill).join(User)
+    """Get all skills with filtering options, newest first.
+
+    Pass the `X-Next-Cursor` response header back as `cursor` for the next page.
+    """
+    query = db.query(Skill, User).join(User, User.id == Skill.user_id)
     
     if status:
         query = query.filter(Skill.status == status)
-    
-    skills = query.offset(skip).limit(limit).all()
-    
-    enhanced_skills = []
-    for skill in skills:
-        enhanced_skills.append(AdminSkillResponse(
-            id=skill.id,
-            name=skill.name,
-            type=skill.type.value,
-            level=skill.level.value,
-            user_id=skill.user_id,
-            user_name=skill.user.name,
-            user_email=skill.user.email,
-            status=skill.status.value,
-            created_at=skill.created_at
-        ))
-    
-    return enhanced_skills
+    if cursor:
+        last_created, last_id = decode_cursor(cursor, datetime, int)
+        query = query.filter(tuple_(Skill.created_at, Skill.id) < tuple_(last_created, last_id))
+        skip = 0
+    
+    rows = query.order_by(Skill.created_at.desc(), Skill.id.desc()).offset(skip).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_skill = rows[-1][0]
+        response.headers["X-Next-Cursor"] = encode_cursor(last_skill.created_at, last_skill.id)
+    
+    return [_admin_skill_response(skill, user) for skill, user in rows]
+
+@admin_router.get("/admin/moderation/queue", response_model=List[ModerationQueueItem])
+def get_moderation_queue(
+    response: Response,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    include_claimed: bool = False,
+    db: Session = Depends(get_db),
+    admin: User = Depends(get_admin_user)
+):
+    """Pending skills by priority, then age.
+
+    Skills claimed by other admins are hidden unless `include_claimed` is set.
+    Pass the `X-Next-Cursor` response header back as `cursor` for the next page.
+    """
+    limit = max(1, min(limit, 100))
+    after = None
+    if cursor:
+        after = tuple(decode_cursor(cursor, int, datetime, int))
+    
+    rows = queue_page(db, admin.id, limit, after, include_claimed)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_skill = rows[-1][0]
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            last_skill.moderation_priority, last_skill.created_at, last_skill.id
+        )
+    return [_queue_item(skill, user) for skill, user in rows]
+
+@admin_router.post("/admin/moderation/claim", response_model=List[ModerationQueueItem])
+def claim_moderation_batch(
+    request: ModerationClaimRequest,
+    db: Session = Depends(get_db),
+    admin: User = Depends(get_admin_user)
+):
+    """Lease the next batch of pending skills to the current admin.
+
+    Claimed skills are hidden from other admins' queues until the lease
+    expires, they are approved or rejected, or the claim is released.
+    Claiming again renews the admin's current claims.
+    """
+    return [_queue_item(skill, user) for skill, user in claim_skills(db, admin.id, request.limit)]
+
+@admin_router.post("/admin/moderation/release")
+def release_moderation_claims(
+    request: ModerationReleaseRequest,
+    db: Session = Depends(get_db),
+    admin: User = Depends(get_admin_user)
+):
+    """Give claimed skills back to the queue"""
+    return {"released": release_claims(db, admin.id, request.skill_ids)}
 
 @admin_router.post("/admin/skills/reject")
 def reject_skill(request: RejectSkillRequest, db: Session = Depends(get_db), _: User = Depends(get_admin_user)):
@@ -197,7 +321,9 @@ def reject_skill(request: RejectSkillRequest, db: Session = Depends(get_db), _:
     if not skill:
         raise HTTPException(status_code=404, detail="Skill not found")
     
+    adjust_counters(db, status_change_deltas("skills", skill.status, SkillStatus.rejected))
     skill.status = "rejected"
+    skill.claimed_by = skill.claim_expires_at = None
     db.commit()
     
     return {"message": f"Skill '{skill.name}' has been rejected. Reason: {request.reason}"}
@@ -209,11 +335,48 @@ def approve_skill(request: ApproveSkillRequest, db: Session = Depends(get_db), _
     if not skill:
         raise HTTPException(status_code=404, detail="Skill not found")
     
+    adjust_counters(db, status_change_deltas("skills", skill.status, SkillStatus.approved))
     skill.status = "approved"
+    skill.claimed_by = skill.claim_expires_at = None
     db.commit()
     
     return {"message": f"Skill '{skill.name}' has been approved"}
 
+@admin_router.post("/admin/skills/bulk", response_model=SkillBulkResponse)
+def bulk_moderate_skills(request: SkillBulkRequest, db: Session = Depends(get_db), _: User = Depends(get_admin_user)):
+    """Approve or reject many skills in one transaction"""
+    new_status = SkillStatus.approved if request.action == SkillBulkAction.APPROVE else SkillStatus.rejected
+    skill_ids = list(dict.fromkeys(request.skill_ids))
+
+    # One UPDATE per previous status, so the counters know exactly what moved
+    updated = set()
+    deltas = {}
+    for old_status in [s for s in SkillStatus if s != new_status] + [None]:
+        condition = Skill.status.is_(None) if old_status is None else Skill.status == old_status
+        moved = db.execute(
+            update(Skill)
+            .where(Skill.id.in_(skill_ids), condition)
+            .values(status=new_status, claimed_by=None, claim_expires_at=None)
+            .returning(Skill.id)
+        ).scalars().all()
+        if moved:
+            updated.update(moved)
+            for name, delta in status_change_deltas("skills", old_status, new_status).items():
+                deltas[name] = deltas.get(name, 0) + delta * len(moved)
+    adjust_counters(db, deltas)
+    db.commit()
+
+    existing = updated | set(db.scalars(select(Skill.id).where(Skill.id.in_(skill_ids))).all())
+    results = [
+        SkillBulkItemResult(skill_id=skill_id, success=True, status=new_status.value)
+        if skill_id in updated else
+        SkillBulkItemResult(skill_id=skill_id, success=True, status=new_status.value, detail=f"Skill was already {new_status.value}")
+        if skill_id in existing else
+        SkillBulkItemResult(skill_id=skill_id, success=False, detail="Skill not found")
+        for skill_id in skill_ids
+    ]
+    return SkillBulkResponse(processed=len(updated), results=results)
+
 @admin_router.get("/admin/swaps", response_model=List[AdminSwapResponse])
 def get_all_swaps(
     skip: int = 0, 
@@ -230,29 +393,7 @@ def get_all_swaps(
     
     swaps = query.offset(skip).limit(limit).all()
     
-    enhanced_swaps = []
-    for swap in swaps:
-        from_user = db.query(User).filter(User.id == swap.from_user_id).first()
-        to_user = db.query(User).filter(User.id == swap.to_user_id).first()
-        skill_offered = db.query(Skill).filter(Skill.id == swap.skill_offered_id).first()
-        skill_requested = db.query(Skill).filter(Skill.id == swap.skill_requested_id).first()
-        
-        enhanced_swaps.append(AdminSwapResponse(
-            id=swap.id,
-            from_user_id=swap.from_user_id,
-            to_user_id=swap.to_user_id,
-            skill_offered_id=swap.skill_offered_id,
-            skill_requested_id=swap.skill_requested_id,
-            status=swap.status,
-            from_user_name=from_user.name if from_user else "Unknown",
-            to_user_name=to_user.name if to_user else "Unknown",
-            skill_offered_name=skill_offered.name if skill_offered else "Unknown",
-            skill_requested_name=skill_requested.name if skill_requested else "Unknown",
-            created_at=swap.created_at,
-            updated_at=swap.updated_at
-        ))
-    
-    return enhanced_swaps
+    return _admin_swap_responses(db, swaps)
 
 @admin_router.post("/admin/messages")
 def create_platform_message(
@@ -271,6 +412,14 @@ def create_platform_message(
     db.commit()
     db.refresh(message)
     
+    invalidate_active_messages()
+    hub.publish("platform_message", {
+        "id": message.id,
+        "title": message.title,
+        "message": message.message,
+        "message_type": message.message_type
+    })
+    
     return {"message": "Platform message created successfully", "id": message.id}
 
 @admin_router.get("/admin/messages")
@@ -298,153 +447,155 @@ def delete_platform_message(
     db.delete(message)
     db.commit()
     
+    invalidate_active_messages()
+    hub.publish("platform_message_deleted", {"id": message_id})
+    
     return {"message": "Platform message deleted successfully"}
 
+def _report_media_type(report_format: str, gzip: bool) -> str:
+    return "application/gzip" if gzip else MEDIA_TYPES[report_format]
+
 @admin_router.post("/admin/reports")
 def generate_report(
     request: ReportRequest,
+    response: Response,
     db: Session = Depends(get_db), 
-    _: User = Depends(get_admin_user)
+    admin: User = Depends(get_admin_user)
 ):
-    """Generate reports in various formats"""
-    
-    start_date = request.start_date or datetime.now() - timedelta(days=30)
-    end_date = request.end_date or datetime.now()
-    
-    if request.report_type == "users":
-        data = db.query(User).filter(
-            and_(User.created_at >= start_date, User.created_at <= end_date)
-        ).all()
-        
-        if request.format == "csv":
-            output = io.StringIO()
-            writer = csv.writer(output)
-            writer.writerow(["ID", "Name", "Email", "Location", "Is Admin", "Is Banned", "Created At"])
-            
-            for user in data:
-                writer.writerow([
-                    user.id, user.name, user.email, user.location,
-                    user.is_admin, user.is_banned, user.created_at
-                ])
-            
-            return Response(
-                content=output.getvalue(),
-                media_type="text/csv",
-                headers={"Content-Disposition": f"attachment; filename=users_report_{datetime.now().strftime('%Y%m%d')}.csv"}
-            )
-        else:
-            return [{"id": u.id, "name": u.name, "email": u.email, "created_at": u.created_at} for u in data]
-    
-    elif request.report_type == "swaps":
-        data = db.query(Swap).filter(
-            and_(Swap.created_at >= start_date, Swap.created_at <= end_date)
-        ).all()
-        
-        if request.format == "csv":
-            output = io.StringIO()
-            writer = csv.writer(output)
-            writer.writerow(["ID", "From User", "To User", "Status", "Created At"])
-            
-            for swap in data:
-                from_user = db.query(User).filter(User.id == swap.from_user_id).first()
-                to_user = db.query(User).filter(User.id == swap.to_user_id).first()
-                writer.writerow([
-                    swap.id, 
-                    from_user.name if from_user else "Unknown",
-                    to_user.name if to_user else "Unknown",
-                    swap.status, swap.created_at
-                ])
-            
-            return Response(
-                content=output.getvalue(),
-                media_type="text/csv",
-                headers={"Content-Disposition": f"attachment; filename=swaps_report_{datetime.now().strftime('%Y%m%d')}.csv"}
-            )
-        else:
-            return [{"id": s.id, "status": s.status, "created_at": s.created_at} for s in data]
-    
-    elif request.report_type == "skills":
-        data = db.query(Skill).filter(
-            and_(Skill.created_at >= start_date, Skill.created_at <= end_date)
-        ).all()
-        
-        if request.format == "csv":
-            output = io.StringIO()
-            writer = csv.writer(output)
-            writer.writerow(["ID", "Name", "Type", "Level", "User", "Status", "Created At"])
-            
-            for skill in data:
-                user = db.query(User).filter(User.id == skill.user_id).first()
-                writer.writerow([
-                    skill.id, skill.name, skill.type.value, skill.level.value,
-                    user.name if user else "Unknown", skill.status.value, skill.created_at
-                ])
-            
-            return Response(
-                content=output.getvalue(),
-                media_type="text/csv",
-                headers={"Content-Disposition": f"attachment; filename=skills_report_{datetime.now().strftime('%Y%m%d')}.csv"}
-            )
-        else:
-            return [{"id": s.id, "name": s.name, "type": s.type.value, "status": s.status.value} for s in data]
-    
-    elif request.report_type == "ratings":
-        data = db.query(Rating).filter(
-            and_(Rating.created_at >= start_date, Rating.created_at <= end_date)
-        ).all()
-        
-        if request.format == "csv":
-            output = io.StringIO()
-            writer = csv.writer(output)
-            writer.writerow(["ID", "From User", "To User", "Stars", "Feedback", "Created At"])
-            
-            for rating in data:
-                from_user = db.query(User).filter(User.id == rating.from_user_id).first()
-                to_user = db.query(User).filter(User.id == rating.to_user_id).first()
-                writer.writerow([
-                    rating.id,
-                    from_user.name if from_user else "Unknown",
-                    to_user.name if to_user else "Unknown",
-                    rating.stars, rating.feedback, rating.created_at
-                ])
-            
-            return Response(
-                content=output.getvalue(),
-                media_type="text/csv",
-                headers={"Content-Disposition": f"attachment; filename=ratings_report_{datetime.now().strftime('%Y%m%d')}.csv"}
-            )
-        else:
-            return [{"id": r.id, "stars": r.stars, "feedback": r.feedback, "created_at": r.created_at} for r in data]
-    
-    else:
+    """Generate reports in various formats.
+
+    The report is streamed: rows are read in batches through a server-side
+    cursor and written out as they arrive, optionally gzip-compressed.
+    With `background` set the report is written to disk by a worker instead,
+    and the job is returned for polling; identical requests share one job.
+    """
+    if request.report_type not in REPORTS:
         raise HTTPException(status_code=400, detail="Invalid report type")
+    if request.format not in WRITERS:
+        raise HTTPException(status_code=400, detail="Invalid report format")
+    if format_unavailable(request.format):
+        raise HTTPException(status_code=400, detail=f"The {request.format} format requires pyarrow")
+
+    if request.background:
+        job = enqueue_report_job(db, request, admin.id)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return job_response(job)
+    
+    start_date, end_date = resolve_report_range(request.start_date, request.end_date)
+    
+    media_type = _report_media_type(request.format, request.gzip)
+    headers = {}
+    if request.format != "json" or request.gzip:
+        filename = report_filename(request.report_type, request.format, request.gzip)
+        headers["Content-Disposition"] = f"attachment; filename={filename}"
+    
+    return StreamingResponse(
+        stream_report(request.report_type, request.format, start_date, end_date, gzip=request.gzip),
+        media_type=media_type,
+        headers=headers
+    )
+
+def _get_report_job(db: Session, job_id: str) -> ReportJob:
+    job = db.query(ReportJob).filter(ReportJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    return job
+
+@admin_router.get("/admin/reports/jobs", response_model=List[ReportJobResponse])
+def list_report_jobs(
+    limit: int = 50,
+    db: Session = Depends(get_db),
+    _: User = Depends(get_admin_user)
+):
+    """List recent report jobs"""
+    jobs = db.query(ReportJob).order_by(ReportJob.created_at.desc()).limit(limit).all()
+    return [job_response(job) for job in jobs]
+
+@admin_router.get("/admin/reports/jobs/{job_id}", response_model=ReportJobResponse)
+def get_report_job(job_id: str, db: Session = Depends(get_db), _: User = Depends(get_admin_user)):
+    """Get the status and progress of a report job"""
+    return job_response(_get_report_job(db, job_id))
+
+@admin_router.get("/admin/reports/jobs/{job_id}/download")
+def download_report_job(job_id: str, db: Session = Depends(get_db), _: User = Depends(get_admin_user)):
+    """Download the result of a completed report job"""
+    job = _get_report_job(db, job_id)
+    if job.status != "completed" or not job.file_path or not os.path.exists(job.file_path):
+        raise HTTPException(status_code=409, detail=f"Report is not available (status: {job.status})")
+    return FileResponse(
+        job.file_path,
+        media_type=_report_media_type(job.format, job.gzip),
+        filename=report_filename(job.report_type, job.format, job.gzip)
+    )
+
+@admin_router.delete("/admin/reports/jobs/{job_id}", response_model=ReportJobResponse)
+def cancel_report(job_id: str, db: Session = Depends(get_db), _: User = Depends(get_admin_user)):
+    """Cancel a queued or running report job"""
+    return job_response(cancel_report_job(db, _get_report_job(db, job_id)))
+
+@admin_router.get("/admin/analytics/timeseries", response_model=TimeSeriesResponse)
+def get_timeseries(
+    metrics: str = "users_registered,swaps_created,ratings_count",
+    granularity: str = "day",
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db),
+    _: User = Depends(get_admin_user)
+):
+    """Activity trends read from the daily rollups.
+
+    `metrics` is a comma-separated list; `granularity` is day, week or month.
+    Defaults to the last 90 days.
+    """
+    names = [m.strip() for m in metrics.split(",") if m.strip()]
+    unknown = [m for m in names if m not in METRICS]
+    if not names or unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown metrics: {unknown}. Available: {METRICS}")
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail="Granularity must be day, week or month")
+    end_date = end_date or datetime.utcnow().date()
+    start_date = start_date or end_date - timedelta(days=89)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+
+    series = read_timeseries(db, names, granularity, start_date, end_date)
+    return TimeSeriesResponse(
+        granularity=granularity,
+        start_date=start_date,
+        end_date=end_date,
+        complete_through=complete_through(db),
+        series=[
+            {"metric": name, "points": [{"period": p, "value": v} for p, v in points]}
+            for name, points in series.items()
+        ]
+    )
+
+@admin_router.get("/admin/db/pool")
+def get_db_pool_status(_: User = Depends(get_admin_user)):
+    """Connection pool occupancy and activity counters, for the primary and each replica"""
+    return {**pool_status(engine), "replicas": [pool_status(replica) for replica in replica_engines]}
+
+@admin_router.get("/admin/profiles", response_model=List[RequestProfileResponse])
+def list_request_profiles(_: User = Depends(get_admin_user)):
+    """Saved request profiles, newest first.
+
+    Send any request with an admin token and `X-Profile: 1` (or `?profile=1`)
+    to record one; its id comes back in `X-Profile-Id`.
+    """
+    return [
+        RequestProfileResponse(**summary, download_url=f"{settings.API_V1_STR}/admin/profiles/{summary['id']}")
+        for summary in list_profiles()
+    ]
+
+@admin_router.get("/admin/profiles/{profile_id}")
+def download_request_profile(profile_id: str, _: User = Depends(get_admin_user)):
+    """Download a profile in speedscope format; open it at https://www.speedscope.app"""
+    path = profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/json", filename=f"{profile_id}.speedscope.json")
 
 @admin_router.get("/admin/stats", response_model=AdminStatsResponse)
 def get_admin_stats(db: Session = Depends(get_db), _: User = Depends(get_admin_user)):
     """Get comprehensive platform statistics"""
-    
-    total_users = db.query(User).count()
-    active_users = db.query(User).filter(User.is_banned == False).count()
-    banned_users = db.query(User).filter(User.is_banned == True).count()
-    total_swaps = db.query(Swap).count()
-    pending_swaps = db.query(Swap).filter(Swap.status == "pending").count()
-    completed_swaps = db.query(Swap).filter(Swap.status == "completed").count()
-    total_skills = db.query(Skill).count()
-    pending_skills = db.query(Skill).filter(Skill.status == "pending").count()
-    total_ratings = db.query(Rating).count()
-    
-    avg_rating_result = db.query(func.avg(Rating.stars)).scalar()
-    average_rating = float(avg_rating_result) if avg_rating_result else 0.0
-    
-    return AdminStatsResponse(
-        total_users=total_users,
-        active_users=active_users,
-        banned_users=banned_users,
-        total_swaps=total_swaps,
-        pending_swaps=pending_swaps,
-        completed_swaps=completed_swaps,
-        total_skills=total_skills,
-        pending_skills=pending_skills,
-        total_ratings=total_ratings,
-        average_rating=average_rating
-    ) 
\ No newline at end of file
+    return get_platform_stats(db)
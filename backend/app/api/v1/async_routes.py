@@ -0,0 +1,116 @@
+"""Async versions of the busiest read endpoints, served from an AsyncSession.
+
+Mounted according to ASYNC_DB_MODE so the sync and async paths can be
+benchmarked against the same database.
+"""
+from collections import defaultdict
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from app.api.v1.users import PublicUserWithSkills, SkillInfo
+from app.core.auth import bearer_email, check_token_user
+from app.db.async_session import get_async_db
+from app.models import User, Skill, Swap, SwapCoin, UserRating
+from app.models.skill import SkillStatus
+from app.schemas.swap import SwapDetailResponse
+from app.schemas.user import UserResponse
+
+router = APIRouter()
+
+async def get_current_user(authorization: str = Header(None), db: AsyncSession = Depends(get_async_db)) -> User:
+    user = await db.scalar(select(User).where(User.email == bearer_email(authorization)))
+    check_token_user(user)
+    return user
+
+@router.get("/me", response_model=UserResponse)
+async def get_current_user_info(user=Depends(get_current_user)):
+    return user
+
+@router.get("/public-users", response_model=List[PublicUserWithSkills])
+async def get_public_users(sort: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    """Same result as the sync endpoint, in two queries: users, then all their approved skills"""
+    query = select(User, UserRating).outerjoin(UserRating, UserRating.user_id == User.id).where(
+        User.is_public == True,
+        User.is_admin == False,
+        User.is_banned == False
+    )
+    if sort == "rating":
+        query = query.order_by(UserRating.bayesian_average.desc().nulls_last(), User.id)
+    rows = (await db.execute(query)).all()
+
+    skills = defaultdict(lambda: {"offered": [], "wanted": []})
+    if rows:
+        skill_rows = await db.execute(
+            select(Skill.id, Skill.user_id, Skill.name, Skill.level, Skill.type)
+            .where(Skill.user_id.in_([user.id for user, _ in rows]), Skill.status == SkillStatus.approved)
+            .order_by(Skill.id)
+        )
+        for skill_id, user_id, name, level, skill_type in skill_rows:
+            if skill_type in ("offered", "wanted"):
+                skills[user_id][skill_type].append(SkillInfo(id=skill_id, name=name, level=level))
+
+    return [
+        PublicUserWithSkills(
+            id=user.id,
+            name=user.name,
+            location=user.location,
+            photo_path=user.photo_path,
+            availability=user.availability,
+            is_public=user.is_public,
+            skills_offered=skills[user.id]["offered"],
+            skills_wanted=skills[user.id]["wanted"],
+            rating=round(rating_stats.average, 1) if rating_stats else 0.0,
+            rating_count=rating_stats.rating_count if rating_stats else 0
+        )
+        for user, rating_stats in rows
+    ]
+
+@router.get("/swaps", response_model=list[SwapDetailResponse])
+async def get_my_swaps(db: AsyncSession = Depends(get_async_db), user=Depends(get_current_user)):
+    """The user's swaps with party and skill names resolved in the same query"""
+    from_user, to_user = aliased(User), aliased(User)
+    skill_offered, skill_requested = aliased(Skill), aliased(Skill)
+    rows = await db.execute(
+        select(Swap, from_user.name, to_user.name, skill_offered.name, skill_requested.name)
+        .outerjoin(from_user, from_user.id == Swap.from_user_id)
+        .outerjoin(to_user, to_user.id == Swap.to_user_id)
+        .outerjoin(skill_offered, skill_offered.id == Swap.skill_offered_id)
+        .outerjoin(skill_requested, skill_requested.id == Swap.skill_requested_id)
+        .where(or_(Swap.from_user_id == user.id, Swap.to_user_id == user.id))
+        .order_by(Swap.id)
+    )
+    return [
+        SwapDetailResponse(
+            id=swap.id,
+            from_user_id=swap.from_user_id,
+            to_user_id=swap.to_user_id,
+            skill_offered_id=swap.skill_offered_id,
+            skill_requested_id=swap.skill_requested_id,
+            status=swap.status,
+            from_user_name=from_name or "Unknown",
+            to_user_name=to_name or "Unknown",
+            skill_offered_name=offered_name or "Unknown",
+            skill_requested_name=requested_name or "Unknown"
+        )
+        for swap, from_name, to_name, offered_name, requested_name in rows
+    ]
+
+@router.get("/coins")
+async def get_user_coins(current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    """Get the current user's swap coins, creating the record on first use"""
+    # Read before the rollback below expires current_user
+    user_id = current_user.id
+    coins = await db.scalar(select(SwapCoin.coins).where(SwapCoin.user_id == user_id))
+    if coins is not None:
+        return {"coins": coins}
+    db.add(SwapCoin(user_id=user_id, coins=0))
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent first request created the record
+        await db.rollback()
+        return {"coins": await db.scalar(select(SwapCoin.coins).where(SwapCoin.user_id == user_id))}
+    return {"coins": 0}
@@ -4,19 +4,13 @@ from app.schemas.user import UserCreate, UserLogin, UserResponse
 from app.schemas.auth import Token
 from app.models import User
 from app.core.security import get_password_hash, verify_password, create_access_token
-from app.db.session import SessionLocal
+from app.db.session import get_db
+from app.services.counters import adjust_counters
 from datetime import datetime
 import re
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.post("/register", response_model=UserResponse)
 def register(user: UserCreate, db: Session = Depends(get_db)):
     try:
@@ -82,6 +76,7 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
         )
         
         db.add(new_user)
+        adjust_counters(db, {"users_total": 1})
         db.commit()
         db.refresh(new_user)
         
@@ -0,0 +1,67 @@
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, HTTPException, status, Header, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from app.core.auth import check_token_user, token_email
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models import User
+from app.services.notifications import hub
+
+router = APIRouter()
+
+def _authenticate(token: str) -> int:
+    """Resolve a token to a user id using a short-lived session.
+
+    The stream can stay open for hours, so it must not hold a pooled
+    connection the way a `get_db` dependency would.
+    """
+    email = token_email(token)
+    db = SessionLocal()
+    try:
+        user = db.query(User.id, User.is_banned).filter(User.email == email).first()
+    finally:
+        db.close()
+    check_token_user(user)
+    return user.id
+
+@router.get("/events")
+async def stream_events(
+    request: Request,
+    token: Optional[str] = None,
+    authorization: str = Header(None)
+):
+    """Server-Sent Events stream of swap and platform notifications for the current user.
+
+    Browsers' EventSource can't send headers, so the token may also be passed as `?token=`.
+    """
+    if authorization and authorization.startswith("Bearer "):
+        token = authorization.split(" ")[1]
+    if not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing or invalid token")
+    user_id = await run_in_threadpool(_authenticate, token)
+
+    queue = hub.subscribe(user_id)
+
+    async def event_stream():
+        try:
+            yield ": connected\n\n"
+            while not await request.is_disconnected():
+                try:
+                    frame = await asyncio.wait_for(queue.get(), timeout=settings.EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield frame
+                # A ban revokes the session: tell the client, then end the stream
+                if frame.startswith("event: session_revoked\n"):
+                    return
+        finally:
+            hub.unsubscribe(user_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,27 @@
+from typing import Optional
+from fastapi import APIRouter, Header, Response
+from fastapi.concurrency import run_in_threadpool
+from app.services.platform_messages import get_active_messages
+
+router = APIRouter()
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+@router.get("/messages")
+async def get_active_platform_messages(if_none_match: Optional[str] = Header(None)):
+    """Active platform announcements, newest first.
+
+    Served from an in-memory snapshot that is refreshed when admins create or
+    delete a message. Send the last `ETag` as `If-None-Match` to get a 304
+    when nothing changed; connected clients are also pushed a
+    `platform_message` event on the /events stream.
+    """
+    snapshot = await run_in_threadpool(get_active_messages)
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(if_none_match, snapshot.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
@@ -1,43 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from app.models import Skill, User
+from app.models import Skill
 from app.schemas.skill import SkillCreate, SkillResponse
-from app.core.security import decode_access_token
-from app.db.session import SessionLocal
+from app.core.auth import get_current_user
+from app.db.session import get_db
+from app.models.skill import SkillStatus
+from app.services.counters import adjust_counters, skill_status_counter
+from app.services.moderation import screen_skill_name, review_priority
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-def get_current_user(authorization: str = Header(None), db: Session = Depends(get_db)) -> User:
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing or invalid token")
-    token = authorization.split(" ")[1]
-    payload = decode_access_token(token)
-    if payload is None or "email" not in payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials"
-        )
-    user = db.query(User).filter(User.email == payload["email"]).first()
-    if user is None:
-        raise HTTPException(status_code=404, detail="User not found")
-    return user
-
 @router.post("/skills", response_model=SkillResponse)
 def create_skill(skill: SkillCreate, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    # Only names flagged by the auto-moderation blocklist wait for an admin
+    reasons = screen_skill_name(skill.name)
+    skill_status = SkillStatus.pending if reasons else SkillStatus.approved
     new_skill = Skill(
         user_id=user.id,
         name=skill.name,
         type=skill.type,
-        level=skill.level
+        level=skill.level,
+        status=skill_status,
+        moderation_priority=review_priority(reasons),
+        moderation_reason=", ".join(reasons) or None
     )
     db.add(new_skill)
+    adjust_counters(db, {"skills_total": 1, skill_status_counter(skill_status): 1})
     db.commit()
     db.refresh(new_skill)
     return new_skill
@@ -1,22 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from app.db.session import SessionLocal
+from app.db.session import get_db
 from app.models import User, SwapCoin, Swap
-from app.core.auth import get_current_user
+from app.core.auth import get_bearer_user
 from typing import Optional
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.get("/coins")
 def get_user_coins(
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_bearer_user),
     db: Session = Depends(get_db)
 ):
     """Get the current user's swap coins"""
@@ -43,7 +36,7 @@ def get_user_coins(
 @router.post("/coins/add")
 def add_coins(
     amount: int,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_bearer_user),
     db: Session = Depends(get_db)
 ):
     """Add coins to user's account"""
@@ -80,7 +73,7 @@ def add_coins(
 @router.post("/coins/deduct")
 def deduct_coins(
     amount: int,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_bearer_user),
     db: Session = Depends(get_db)
 ):
     """Deduct coins from user's account"""
@@ -117,7 +110,7 @@ def deduct_coins(
 
 @router.post("/coins/check-swap-bonus")
 def check_swap_bonus(
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_bearer_user),
     db: Session = Depends(get_db)
 ):
     """Check if user has completed swaps and award bonus coins"""
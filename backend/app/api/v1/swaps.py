@@ -1,103 +1,103 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import and_, func, or_, text, update, insert as sa_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased
 from app.models import Swap, SwapStatus, User, Skill, Rating, SwapCoin
-from app.schemas.swap import SwapCreate, SwapResponse, SwapRequest, SwapDetailResponse
+from app.models.swap import swap_status_values
+from app.schemas.swap import (
+    SwapCreate, SwapResponse, SwapRequest, SwapDetailResponse,
+    SwapBulkAction, SwapBulkRequest, SwapBulkItemResult, SwapBulkResponse
+)
 from app.schemas.rating import RatingCreate, RatingResponse, SwapCompleteRequest
-from app.core.security import decode_access_token
-from app.db.session import SessionLocal
+from app.core.auth import get_current_user
+from app.db.session import get_db
+from app.services.counters import adjust_counters, swap_status_counter
+from app.services.notifications import hub
+from app.services.ratings import record_rating
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+def _insert_pending_swap(db: Session, values: dict):
+    """Insert a pending swap without committing, returning its id or None if an identical one is already pending"""
+    dialect = db.bind.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        try:
+            with db.begin_nested():
+                return db.execute(sa_insert(Swap).values(**values).returning(Swap.id)).scalar()
+        except IntegrityError:
+            return None
 
-def get_current_user(authorization: str = Header(None), db: Session = Depends(get_db)) -> User:
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing or invalid token")
-    token = authorization.split(" ")[1]
-    payload = decode_access_token(token)
-    if payload is None or "email" not in payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials"
-        )
-    user = db.query(User).filter(User.email == payload["email"]).first()
-    if user is None:
-        raise HTTPException(status_code=404, detail="User not found")
-    return user
+    stmt = insert(Swap).values(**values).on_conflict_do_nothing(
+        index_elements=["from_user_id", "to_user_id", "skill_offered_id", "skill_requested_id"],
+        index_where=text("status = 'pending'"),
+    ).returning(Swap.id)
+    return db.execute(stmt).scalar()
 
 @router.post("/swaps", response_model=SwapResponse)
 def create_swap(swap: SwapRequest, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    # Validate that the skills belong to the users
-    skill_offered = db.query(Skill).filter(
-        Skill.id == swap.skill_offered_id,
-        Skill.user_id == user.id
-    ).first()
+    # Validate that both skills belong to the right users in a single query
+    owned_skill_ids = {
+        row.id for row in db.query(Skill.id).filter(
+            or_(
+                and_(Skill.id == swap.skill_offered_id, Skill.user_id == user.id),
+                and_(Skill.id == swap.skill_requested_id, Skill.user_id == swap.to_user_id)
+            )
+        ).all()
+    }
     
-    if not skill_offered:
+    if swap.skill_offered_id not in owned_skill_ids:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Skill offered not found or doesn't belong to you"
         )
     
-    skill_requested = db.query(Skill).filter(
-        Skill.id == swap.skill_requested_id,
-        Skill.user_id == swap.to_user_id
-    ).first()
-    
-    if not skill_requested:
+    if swap.skill_requested_id not in owned_skill_ids:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Requested skill not found or doesn't belong to the target user"
         )
     
-    # Check if a swap already exists between these users for these skills
-    existing_swap = db.query(Swap).filter(
-        Swap.from_user_id == user.id,
-        Swap.to_user_id == swap.to_user_id,
-        Swap.skill_offered_id == swap.skill_offered_id,
-        Swap.skill_requested_id == swap.skill_requested_id,
-        Swap.status == SwapStatus.pending
-    ).first()
-    
-    if existing_swap:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="A swap request already exists for these skills"
-        )
-    
-    new_swap = Swap(
+    # The partial unique index on pending swaps rejects duplicates, even under double-submit
+    values = dict(
         from_user_id=user.id,
         to_user_id=swap.to_user_id,
         skill_offered_id=swap.skill_offered_id,
         skill_requested_id=swap.skill_requested_id,
         status=SwapStatus.pending
     )
-    db.add(new_swap)
+    new_id = _insert_pending_swap(db, values)
+    if new_id is not None:
+        adjust_counters(db, {"swaps_total": 1, "swaps_pending": 1})
     db.commit()
-    db.refresh(new_swap)
-    return new_swap
+    
+    if new_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A swap request already exists for these skills"
+        )
+    
+    hub.publish("swap_created", {"swap_id": new_id, "from_user_id": user.id, "from_user_name": user.name}, [swap.to_user_id])
+    return SwapResponse(id=new_id, **values)
 
 @router.get("/swaps", response_model=list[SwapDetailResponse])
 def get_my_swaps(db: Session = Depends(get_db), user=Depends(get_current_user)):
-    swaps = db.query(Swap).filter(
-        (Swap.from_user_id == user.id) | (Swap.to_user_id == user.id)
-    ).all()
+    # User and skill names are joined in rather than looked up per swap
+    from_user, to_user = aliased(User), aliased(User)
+    skill_offered, skill_requested = aliased(Skill), aliased(Skill)
+    rows = db.query(Swap, from_user.name, to_user.name, skill_offered.name, skill_requested.name) \
+        .outerjoin(from_user, from_user.id == Swap.from_user_id) \
+        .outerjoin(to_user, to_user.id == Swap.to_user_id) \
+        .outerjoin(skill_offered, skill_offered.id == Swap.skill_offered_id) \
+        .outerjoin(skill_requested, skill_requested.id == Swap.skill_requested_id) \
+        .filter((Swap.from_user_id == user.id) | (Swap.to_user_id == user.id)) \
+        .order_by(Swap.id).all()
     
     result = []
-    for swap in swaps:
-        # Get user names
-        from_user = db.query(User).filter(User.id == swap.from_user_id).first()
-        to_user = db.query(User).filter(User.id == swap.to_user_id).first()
-        
-        # Get skill names
-        skill_offered = db.query(Skill).filter(Skill.id == swap.skill_offered_id).first()
-        skill_requested = db.query(Skill).filter(Skill.id == swap.skill_requested_id).first()
-        
+    for swap, from_name, to_name, offered_name, requested_name in rows:
         result.append(SwapDetailResponse(
             id=swap.id,
             from_user_id=swap.from_user_id,
@@ -105,10 +105,10 @@ def get_my_swaps(db: Session = Depends(get_db), user=Depends(get_current_user)):
             skill_offered_id=swap.skill_offered_id,
             skill_requested_id=swap.skill_requested_id,
             status=swap.status,
-            from_user_name=from_user.name if from_user else "Unknown",
-            to_user_name=to_user.name if to_user else "Unknown",
-            skill_offered_name=skill_offered.name if skill_offered else "Unknown",
-            skill_requested_name=skill_requested.name if skill_requested else "Unknown"
+            from_user_name=from_name or "Unknown",
+            to_user_name=to_name or "Unknown",
+            skill_offered_name=offered_name or "Unknown",
+            skill_requested_name=requested_name or "Unknown"
         ))
     
     return result
@@ -128,8 +128,11 @@ def accept_swap(swap_id: int, db: Session = Depends(get_db), user=Depends(get_cu
         )
     
     swap.status = SwapStatus.accepted
+    swap.accepted_at = func.now()
+    adjust_counters(db, {"swaps_pending": -1, "swaps_accepted": 1})
     db.commit()
     db.refresh(swap)
+    hub.publish("swap_accepted", {"swap_id": swap.id, "by_user_id": user.id}, [swap.from_user_id])
     return swap
 
 @router.put("/swaps/{swap_id}/complete", response_model=SwapResponse)
@@ -149,6 +152,8 @@ def complete_swap(swap_id: int, db: Session = Depends(get_db), user=Depends(get_
     
     # Mark swap as completed
     swap.status = SwapStatus.completed
+    swap.completed_at = func.now()
+    adjust_counters(db, {"swaps_accepted": -1, "swaps_completed": 1})
     
     # Award 5 coins to both users
     for user_id in [swap.from_user_id, swap.to_user_id]:
@@ -161,6 +166,7 @@ def complete_swap(swap_id: int, db: Session = Depends(get_db), user=Depends(get_
     
     db.commit()
     db.refresh(swap)
+    hub.publish("swap_completed", {"swap_id": swap.id, "by_user_id": user.id, "coins_awarded": 5}, [swap.from_user_id, swap.to_user_id])
     return swap
 
 @router.post("/swaps/{swap_id}/rate", response_model=RatingResponse)
@@ -221,8 +227,11 @@ def rate_swap(swap_id: int, rating: RatingCreate, db: Session = Depends(get_db),
     )
     
     db.add(new_rating)
+    record_rating(db, rating.to_user_id, rating.stars)
+    adjust_counters(db, {"ratings_total": 1, "ratings_stars": rating.stars})
     db.commit()
     db.refresh(new_rating)
+    hub.publish("swap_rated", {"swap_id": swap_id, "from_user_id": user.id, "stars": new_rating.stars}, [new_rating.to_user_id])
     return new_rating
 
 @router.get("/swaps/{swap_id}/ratings", response_model=list[RatingResponse])
@@ -258,9 +267,48 @@ def reject_swap(swap_id: int, db: Session = Depends(get_db), user=Depends(get_cu
         )
     
     swap.status = SwapStatus.rejected
+    swap.rejected_at = func.now()
+    adjust_counters(db, {"swaps_pending": -1, "swaps_rejected": 1})
     db.commit()
+    hub.publish("swap_rejected", {"swap_id": swap.id, "by_user_id": user.id}, [swap.from_user_id])
     return {"message": "Swap rejected successfully"}
 
+@router.post("/swaps/bulk", response_model=SwapBulkResponse)
+def bulk_swap_action(request: SwapBulkRequest, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    """Accept or reject many incoming swap requests in one transaction"""
+    new_status = SwapStatus.accepted if request.action == SwapBulkAction.accept else SwapStatus.rejected
+    swap_ids = list(dict.fromkeys(request.swap_ids))
+    
+    # Ownership and state are checked by the UPDATE itself, so concurrent changes can't slip through
+    updated = dict(db.execute(
+        update(Swap)
+        .where(
+            Swap.id.in_(swap_ids),
+            Swap.to_user_id == user.id,
+            Swap.status == SwapStatus.pending
+        )
+        .values(**swap_status_values(new_status))
+        .returning(Swap.id, Swap.from_user_id)
+    ).all())
+    adjust_counters(db, {"swaps_pending": -len(updated), swap_status_counter(new_status): len(updated)})
+    db.commit()
+    
+    event_type = "swap_accepted" if new_status == SwapStatus.accepted else "swap_rejected"
+    for swap_id, from_user_id in updated.items():
+        hub.publish(event_type, {"swap_id": swap_id, "by_user_id": user.id}, [from_user_id])
+    
+    results = [
+        SwapBulkItemResult(swap_id=swap_id, success=True, status=new_status)
+        if swap_id in updated else
+        SwapBulkItemResult(
+            swap_id=swap_id,
+            success=False,
+            detail=f"Swap not found or not authorized to {request.action.value}"
+        )
+        for swap_id in swap_ids
+    ]
+    return SwapBulkResponse(processed=len(updated), results=results)
+
 @router.delete("/swaps/{swap_id}", response_model=dict)
 def delete_swap(swap_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
     swap = db.query(Swap).filter(
@@ -274,6 +322,7 @@ def delete_swap(swap_id: int, db: Session = Depends(get_db), user=Depends(get_cu
             detail="Swap not found or not authorized to delete"
         )
     
+    adjust_counters(db, {"swaps_total": -1, swap_status_counter(swap.status): -1})
     db.delete(swap)
     db.commit()
     return {"message": "Swap deleted successfully"}
@@ -1,40 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header, UploadFile, File
+from collections import defaultdict
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 from sqlalchemy.orm import Session
-from app.models import User, Skill, Rating, Swap
+from app.models import User, Skill, Swap, UserRating
+from app.models.skill import SkillStatus
 from app.schemas.user import UserResponse
-from app.core.security import decode_access_token
-from app.db.session import SessionLocal
-from typing import List
+from app.core.auth import get_current_user
+from app.db.session import get_db
+from typing import List, Optional
 from pydantic import BaseModel
-from sqlalchemy import func
 import os
 import shutil
 from pathlib import Path
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-def get_current_user(authorization: str = Header(None), db: Session = Depends(get_db)) -> User:
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing or invalid token")
-    token = authorization.split(" ")[1]
-    payload = decode_access_token(token)
-    if payload is None or "email" not in payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials"
-        )
-    user = db.query(User).filter(User.email == payload["email"]).first()
-    if user is None:
-        raise HTTPException(status_code=404, detail="User not found")
-    return user
-
 @router.get("/me", response_model=UserResponse)
 def get_current_user_info(user=Depends(get_current_user)):
     return user
@@ -81,22 +60,42 @@ class PublicUserWithSkills(BaseModel):
     is_public: bool
     skills_offered: List[SkillInfo] = []
     skills_wanted: List[SkillInfo] = []
+    rating: float = 0.0
+    rating_count: int = 0
     
     class Config:
         from_attributes = True
 
 @router.get("/public-users", response_model=List[PublicUserWithSkills])
-def get_public_users(db: Session = Depends(get_db)):
-    """Get all public users with their skills for the browse page (excluding admins)"""
-    users = db.query(User).filter(
+def get_public_users(sort: Optional[str] = None, db: Session = Depends(get_db)):
+    """Get all public users with their skills for the browse page (excluding admins and banned users).
+
+    Pass `sort=rating` to rank users by their Bayesian average rating.
+    """
+    query = db.query(User, UserRating).outerjoin(UserRating, UserRating.user_id == User.id).filter(
         User.is_public == True,
-        User.is_admin == False
-    ).all()
+        User.is_admin == False,
+        User.is_banned == False
+    )
+    if sort == "rating":
+        query = query.order_by(UserRating.bayesian_average.desc().nulls_last(), User.id)
+    
+    rows = query.all()
+    
+    # Everyone's skills in one query rather than one per user;
+    # skills waiting for moderation or rejected are not browsable
+    skills_by_user = defaultdict(list)
+    if rows:
+        skills = db.query(Skill).filter(
+            Skill.user_id.in_([user.id for user, _ in rows]),
+            Skill.status == SkillStatus.approved
+        ).order_by(Skill.id)
+        for skill in skills:
+            skills_by_user[skill.user_id].append(skill)
     
     result = []
-    for user in users:
-        # Get user's skills
-        skills = db.query(Skill).filter(Skill.user_id == user.id).all()
+    for user, rating_stats in rows:
+        skills = skills_by_user[user.id]
         
         # Separate offered and wanted skills with full skill info
         skills_offered = [
@@ -116,7 +115,9 @@ def get_public_users(db: Session = Depends(get_db)):
             availability=user.availability,
             is_public=user.is_public,
             skills_offered=skills_offered,
-            skills_wanted=skills_wanted
+            skills_wanted=skills_wanted,
+            rating=round(rating_stats.average, 1) if rating_stats else 0.0,
+            rating_count=rating_stats.rating_count if rating_stats else 0
         ))
     
     return result
@@ -130,12 +131,9 @@ class UserStats(BaseModel):
 def get_user_stats(db: Session = Depends(get_db), user=Depends(get_current_user)):
     """Get user statistics including average rating and total swaps"""
     
-    # Calculate average rating
-    avg_rating_result = db.query(func.avg(Rating.stars)).filter(
-        Rating.to_user_id == user.id
-    ).scalar()
-    
-    avg_rating = float(avg_rating_result) if avg_rating_result else 0.0
+    # Average rating from the running aggregates maintained by rate_swap
+    rating_stats = db.query(UserRating).filter(UserRating.user_id == user.id).first()
+    avg_rating = rating_stats.average if rating_stats else 0.0
     
     # Count total swaps
     total_swaps = db.query(Swap).filter(
@@ -1,24 +1,59 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, status, Header
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from app.core.security import decode_access_token
-from app.db.session import SessionLocal
+from app.db.session import get_db
 from app.models import User
 
 security = HTTPBearer()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Both dependencies share the request's session with the endpoint, see app/db/session.py
+
+def reject_banned(user):
+    """Refuse banned accounts.
+
+    `decode_access_token` already rejects tokens of users in the revocation
+    list, but that list only hears of bans made on other workers when the
+    notifications backend is shared; the user row is the authoritative check.
+    """
+    if user.is_banned:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Your account has been banned. Please contact support."
+        )
+
+def bearer_email(authorization: str) -> str:
+    """Email of the account an `Authorization: Bearer` header's token was issued to"""
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing or invalid token")
+    return token_email(authorization.split(" ")[1])
+
+def token_email(token: str) -> str:
+    """Email of the account a token was issued to"""
+    payload = decode_access_token(token)
+    if payload is None or "email" not in payload:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials"
+        )
+    return payload["email"]
+
+def check_token_user(user):
+    """Refuse a token whose user no longer exists or is banned"""
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    reject_banned(user)
+
+def get_current_user(authorization: str = Header(None), db: Session = Depends(get_db)) -> User:
+    user = db.query(User).filter(User.email == bearer_email(authorization)).first()
+    check_token_user(user)
+    return user
 
-def get_current_user(
+def get_bearer_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ) -> User:
-    """Get the current authenticated user from JWT token"""
+    """Get the current authenticated user from JWT token, via the HTTPBearer scheme"""
     try:
         token = credentials.credentials
         payload = decode_access_token(token)
@@ -45,6 +80,7 @@ def get_current_user(
                 detail="User not found",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+        reject_banned(user)
         
         return user
         
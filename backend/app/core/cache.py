@@ -0,0 +1,52 @@
+import threading
+import time
+from typing import Any, Callable, Optional
+from app.core.metrics import CACHE_REQUESTS
+
+
+class SnapshotCache:
+    """Holds one computed value for `ttl` seconds.
+
+    Refreshes are single-flight: when the snapshot is stale, one caller
+    recomputes it while concurrent callers wait for that result instead of
+    running the computation themselves. An `invalidate` that lands while a
+    refresh is running discards that result, so it can't outlive the change.
+    """
+
+    def __init__(self, ttl: float, name: str = "snapshot"):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._hit_counter = CACHE_REQUESTS.labels(name, "hit")
+        self._miss_counter = CACHE_REQUESTS.labels(name, "miss")
+        self._value: Any = None
+        self._expires_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, loader: Callable[[], Any]) -> Any:
+        if time.monotonic() < self._expires_at:
+            self.hits += 1
+            self._hit_counter.inc()
+            return self._value
+        with self._lock:
+            # Another caller may have refreshed while we waited for the lock
+            if time.monotonic() < self._expires_at:
+                self.hits += 1
+                self._hit_counter.inc()
+                return self._value
+            self.misses += 1
+            self._miss_counter.inc()
+            generation = self._generation
+            value = loader()
+            self._value = value
+            if generation == self._generation:
+                self._expires_at = time.monotonic() + self.ttl
+            return value
+
+    def peek(self) -> Optional[Any]:
+        return self._value if time.monotonic() < self._expires_at else None
+
+    def invalidate(self):
+        self._generation += 1
+        self._expires_at = 0.0
@@ -13,5 +13,88 @@ class Settings:
         "DATABASE_URL",
         "sqlite:///./skillswap.db"
     )
+    # Comma-separated read replicas of DATABASE_URL; GET requests read from them when set
+    DATABASE_REPLICA_URLS: list = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+    # How long a client that wrote keeps reading from the primary (read-your-writes)
+    REPLICA_PIN_SECONDS: float = float(os.getenv("REPLICA_PIN_SECONDS", "5"))
+    # Per-request statement counting, reported in the Server-Timing header
+    QUERY_STATS_ENABLED: bool = os.getenv("QUERY_STATS_ENABLED", "true").lower() == "true"
+    # Log requests that run the same statement this many times (likely N+1) or exceed the budget
+    QUERY_REPEAT_THRESHOLD: int = int(os.getenv("QUERY_REPEAT_THRESHOLD", "5"))
+    QUERY_BUDGET: int = int(os.getenv("QUERY_BUDGET", "30"))
+    # Prometheus metrics on /metrics; see app/core/metrics.py for multi-worker setup
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    # Concurrent bcrypt hash/verify calls per worker
+    PASSWORD_HASH_CONCURRENCY: int = int(os.getenv("PASSWORD_HASH_CONCURRENCY", str(os.cpu_count() or 4)))
+    # Admin requests with `X-Profile: 1` or `?profile=1` are profiled, see app/core/profiling.py
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "true").lower() == "true"
+    PROFILES_DIR: str = os.getenv("PROFILES_DIR", "profiles")
+    PROFILES_MAX_FILES: int = int(os.getenv("PROFILES_MAX_FILES", "50"))
+    PROFILE_SAMPLE_INTERVAL_MS: float = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "2"))
+    # Sampling stops after this long, so profiling a stream does not grow without bound
+    PROFILE_MAX_SECONDS: float = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+    # Stale swap sweeper
+    SWAP_SWEEPER_ENABLED: bool = os.getenv("SWAP_SWEEPER_ENABLED", "true").lower() == "true"
+    SWAP_PENDING_TTL_HOURS: int = int(os.getenv("SWAP_PENDING_TTL_HOURS", str(24 * 14)))  # 2 weeks
+    SWAP_ACCEPTED_TTL_HOURS: int = int(os.getenv("SWAP_ACCEPTED_TTL_HOURS", str(24 * 30)))  # 30 days
+    SWAP_SWEEP_INTERVAL_SECONDS: int = int(os.getenv("SWAP_SWEEP_INTERVAL_SECONDS", "300"))
+    SWAP_SWEEP_BATCH_SIZE: int = int(os.getenv("SWAP_SWEEP_BATCH_SIZE", "500"))
+    # Real-time notifications: "local" (single process) or "postgres" (LISTEN/NOTIFY across workers)
+    NOTIFICATIONS_BACKEND: str = os.getenv("NOTIFICATIONS_BACKEND", "local")
+    NOTIFICATIONS_CHANNEL: str = os.getenv("NOTIFICATIONS_CHANNEL", "skillswap_events")
+    EVENTS_KEEPALIVE_SECONDS: int = int(os.getenv("EVENTS_KEEPALIVE_SECONDS", "15"))
+    # Bayesian rating: averages are shrunk towards RATING_PRIOR_MEAN as if each
+    # user already had RATING_PRIOR_WEIGHT ratings at that value
+    RATING_PRIOR_MEAN: float = float(os.getenv("RATING_PRIOR_MEAN", "3.0"))
+    RATING_PRIOR_WEIGHT: float = float(os.getenv("RATING_PRIOR_WEIGHT", "5"))
+    # Admin dashboard stats snapshot lifetime
+    ADMIN_STATS_TTL_SECONDS: float = float(os.getenv("ADMIN_STATS_TTL_SECONDS", "10"))
+    # Platform counters drift check
+    COUNTERS_RECONCILE_ENABLED: bool = os.getenv("COUNTERS_RECONCILE_ENABLED", "true").lower() == "true"
+    COUNTERS_RECONCILE_INTERVAL_SECONDS: int = int(os.getenv("COUNTERS_RECONCILE_INTERVAL_SECONDS", "3600"))
+    # Rows fetched per server-side cursor batch when exporting reports
+    REPORT_BATCH_SIZE: int = int(os.getenv("REPORT_BATCH_SIZE", "1000"))
+    # Background report jobs
+    REPORT_JOB_DIR: str = os.getenv("REPORT_JOB_DIR", "report_jobs")
+    REPORT_JOB_WORKERS: int = int(os.getenv("REPORT_JOB_WORKERS", "2"))
+    REPORT_JOB_RESULT_TTL_SECONDS: int = int(os.getenv("REPORT_JOB_RESULT_TTL_SECONDS", "3600"))
+    # Running jobs save their progress, and notice cancellations made through other workers, every N batches
+    REPORT_JOB_PROGRESS_BATCHES: int = int(os.getenv("REPORT_JOB_PROGRESS_BATCHES", "5"))
+    # Each worker marks the jobs it holds as alive this often; queued/running jobs that miss
+    # several heartbeats (e.g. their worker restarted) are marked failed
+    REPORT_JOB_MONITOR_ENABLED: bool = os.getenv("REPORT_JOB_MONITOR_ENABLED", "true").lower() == "true"
+    REPORT_JOB_HEARTBEAT_SECONDS: int = int(os.getenv("REPORT_JOB_HEARTBEAT_SECONDS", "30"))
+    # Daily analytics rollups
+    ROLLUPS_ENABLED: bool = os.getenv("ROLLUPS_ENABLED", "true").lower() == "true"
+    ROLLUPS_INTERVAL_SECONDS: int = int(os.getenv("ROLLUPS_INTERVAL_SECONDS", "3600"))
+    # New skills whose names match the blocklist wait in the moderation queue
+    MODERATION_ENABLED: bool = os.getenv("MODERATION_ENABLED", "true").lower() == "true"
+    MODERATION_BLOCKLIST_PATH: str = os.getenv(
+        "MODERATION_BLOCKLIST_PATH", os.path.join(os.path.dirname(__file__), "..", "services", "moderation_blocklist.txt")
+    )
+    # How long an admin's claim on queued skills lasts before others can take them
+    MODERATION_LEASE_SECONDS: int = int(os.getenv("MODERATION_LEASE_SECONDS", "300"))
+    # Safety net for the active platform messages snapshot; changes invalidate it immediately
+    PLATFORM_MESSAGES_CACHE_TTL_SECONDS: float = float(os.getenv("PLATFORM_MESSAGES_CACHE_TTL_SECONDS", "300"))
+    # Connection pool (file-based SQLite and Postgres)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT_SECONDS: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    # Off by default: pool_recycle already retires old connections without a round trip per checkout
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "false").lower() == "true"
+    DB_QUERY_CACHE_SIZE: int = int(os.getenv("DB_QUERY_CACHE_SIZE", "1000"))
+    # Postgres session limits and statement preparation
+    DB_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+    DB_IDLE_IN_TRANSACTION_TIMEOUT_MS: int = int(os.getenv("DB_IDLE_IN_TRANSACTION_TIMEOUT_MS", "60000"))
+    DB_PREPARE_THRESHOLD: int = int(os.getenv("DB_PREPARE_THRESHOLD", "5"))
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", "500"))  # asyncpg
+    # Async endpoints: "off", "shadow" (served under /api/v1/async alongside the sync ones)
+    # or "on" (they replace the sync versions of the same paths)
+    ASYNC_DB_MODE: str = os.getenv("ASYNC_DB_MODE", "off").lower()
+    # SQLite pragmas applied to every connection
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    SQLITE_CACHE_SIZE_KB: int = int(os.getenv("SQLITE_CACHE_SIZE_KB", str(64 * 1024)))
 
 settings = Settings()
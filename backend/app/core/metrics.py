@@ -0,0 +1,89 @@
+"""Prometheus metrics, served on /metrics.
+
+With several worker processes, point PROMETHEUS_MULTIPROC_DIR at an empty
+directory shared by the workers (and cleared on deploy) before they start;
+prometheus_client then keeps values in per-process files and /metrics
+aggregates them, whichever worker serves the scrape.
+"""
+import os
+import time
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time to serve a request, including the response body",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "Requests being served", ["method"], multiprocess_mode="livesum"
+)
+RESPONSES = Counter("http_responses", "Responses sent", ["method", "route", "status"])
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled database connection", ["database"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5, 30),
+)
+PASSWORD_HASH_QUEUE = Gauge(
+    "password_hash_queue_depth", "bcrypt hash and verify calls waiting for or holding a slot", ["state"],
+    multiprocess_mode="livesum"
+)
+CACHE_REQUESTS = Counter("cache_requests", "In-memory cache lookups", ["cache", "result"])
+
+# Label for requests that matched no route, so scanners can't create unbounded series
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def route_label(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Records latency, in-flight requests and status codes per route template.
+
+    A plain ASGI middleware rather than an `@app.middleware` function, so the
+    timing covers streamed bodies and the status is the one actually sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            route = route_label(scope)
+            REQUEST_LATENCY.labels(method, route).observe(time.perf_counter() - start)
+            RESPONSES.labels(method, route, str(status_code)).inc()
+
+
+def render_metrics():
+    """Exposition text and content type for a scrape"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_stopped():
+    """Drop this worker's live gauges from the shared files when it exits"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,40 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List
+from fastapi import HTTPException, status
+
+
+def encode_cursor(*values: Any) -> str:
+    """Opaque keyset cursor holding the sort key of the last row on a page"""
+    raw = json.dumps(list(values), default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _cursor_value(value: Any, kind: type) -> Any:
+    if kind is datetime:
+        # Raises TypeError for anything but a string
+        return datetime.fromisoformat(value)
+    if isinstance(value, bool):
+        raise TypeError("booleans are not cursor values")
+    if kind is float and isinstance(value, int):
+        return float(value)
+    if not isinstance(value, kind):
+        raise TypeError(f"expected {kind.__name__}")
+    return value
+
+
+def decode_cursor(cursor: str, *kinds: type) -> List[Any]:
+    """Values of a cursor made by `encode_cursor`, one per type in `kinds`.
+
+    Datetimes are parsed back from the ISO strings they were encoded as; a
+    cursor that was tampered with or made for another sort is a 400.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(kinds):
+            raise ValueError("wrong number of values")
+        return [_cursor_value(value, kind) for value, kind in zip(values, kinds)]
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
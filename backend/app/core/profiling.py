@@ -0,0 +1,263 @@
+"""Sampling profiles of single requests, taken on demand in production.
+
+An admin sends a request with `X-Profile: 1` (or `?profile=1`). While it is
+served, a sampler thread records the stacks of the threads working on it:
+the event loop while it runs the request's coroutines, and the threadpool
+workers running its sync endpoint and dependencies. The result is saved as a
+speedscope file (open it at https://www.speedscope.app) in PROFILES_DIR, which
+keeps the newest PROFILES_MAX_FILES, and is listed under /admin/profiles.
+
+Requests without the header or parameter only pay for checking them.
+"""
+import inspect
+import json
+import logging
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from app.core.config import settings
+from app.core.metrics import route_label
+from app.core.security import decode_access_token
+from app.db.session import SessionLocal
+from app.models import User
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+# Millisecond timestamp first, so ids sort oldest to newest
+_PROFILE_ID = re.compile(r"^\d{13}-[0-9a-f]{8}$")
+_TRUE_VALUES = ("1", "true", "yes")
+
+_active_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("active_profile", default=None)
+
+
+def profile_requested(scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            return value.decode("latin-1").strip().lower() in _TRUE_VALUES
+    query = scope.get("query_string", b"")
+    if b"profile" not in query:
+        return False
+    return parse_qs(query.decode("latin-1")).get("profile", [""])[-1].lower() in _TRUE_VALUES
+
+
+def is_admin_token(authorization: Optional[str]) -> bool:
+    if not authorization or not authorization.startswith("Bearer "):
+        return False
+    payload = decode_access_token(authorization.split(" ")[1])
+    if payload is None or "email" not in payload:
+        return False
+    db = SessionLocal()
+    try:
+        return bool(db.query(User.is_admin).filter(User.email == payload["email"]).scalar())
+    finally:
+        db.close()
+
+
+class RequestProfile:
+    """Stacks sampled from the threads serving one request.
+
+    A thread's stack is kept when it is running on the request's behalf: the
+    event loop when one of its coroutines holds the request's ASGI scope, a
+    threadpool worker when the context it runs in belongs to this profile.
+    """
+
+    def __init__(self, scope):
+        self.id = f"{time.time_ns() // 1_000_000}-{secrets.token_hex(4)}"
+        self.scope = scope
+        self.interval = settings.PROFILE_SAMPLE_INTERVAL_MS / 1000
+        self.created_at = datetime.utcnow()
+        self.duration = 0.0
+        # thread id -> (stack of code objects from the root, seconds since the previous sample)
+        self.samples: Dict[int, List[tuple]] = defaultdict(list)
+        self.thread_names: Dict[int, str] = {}
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, name=f"profile-{self.id}", daemon=True)
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._sampler.start()
+
+    def stop(self):
+        self.duration = time.perf_counter() - self._started
+        self._stop.set()
+        self._sampler.join()
+
+    def _sample(self):
+        own = threading.get_ident()
+        deadline = self._started + settings.PROFILE_MAX_SECONDS
+        last = self._started
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            if now > deadline:
+                logger.warning("Stopped profiling %s after %ss", self.scope["path"], settings.PROFILE_MAX_SECONDS)
+                return
+            weight, last = now - last, now
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = self._request_stack(frame)
+                if stack:
+                    self.samples[thread_id].append((stack, weight))
+        for thread in threading.enumerate():
+            if thread.ident in self.samples:
+                self.thread_names[thread.ident] = thread.name
+
+    def _request_stack(self, frame) -> Optional[tuple]:
+        codes = []
+        ours = False
+        while frame is not None:
+            code = frame.f_code
+            codes.append(code)
+            if not ours and self._owns(frame, code):
+                ours = True
+            frame = frame.f_back
+        return tuple(reversed(codes)) if ours else None
+
+    def _owns(self, frame, code) -> bool:
+        if code.co_flags & inspect.CO_COROUTINE and ("scope" in code.co_varnames or "scope" in code.co_freevars):
+            return frame.f_locals.get("scope") is self.scope
+        # anyio's worker loop runs each call as `context.run(func, *args)`
+        if code.co_name == "run" and "context" in code.co_varnames:
+            context = frame.f_locals.get("context")
+            return hasattr(context, "get") and context.get(_active_profile) is self
+        return False
+
+    def speedscope(self) -> dict:
+        frames, index = [], {}
+        profiles = []
+        for thread_id, samples in self.samples.items():
+            stacks, weights = [], []
+            for stack, weight in samples:
+                ids = []
+                for code in stack:
+                    key = (code.co_filename, code.co_firstlineno, code.co_name)
+                    if key not in index:
+                        index[key] = len(frames)
+                        frames.append({
+                            "name": getattr(code, "co_qualname", code.co_name),
+                            "file": code.co_filename,
+                            "line": code.co_firstlineno,
+                        })
+                    ids.append(index[key])
+                stacks.append(ids)
+                weights.append(weight)
+            profiles.append({
+                "type": "sampled",
+                "name": self.thread_names.get(thread_id, f"thread {thread_id}"),
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": stacks,
+                "weights": weights,
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"{self.scope['method']} {self.scope['path']}",
+            "exporter": "skillswap request profiler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+
+def _profile_files(profile_id: str):
+    directory = Path(settings.PROFILES_DIR)
+    return directory / f"{profile_id}.speedscope.json", directory / f"{profile_id}.meta.json"
+
+
+def save_profile(profile: RequestProfile, status_code: int):
+    """Write the profile and its summary, then drop the oldest beyond PROFILES_MAX_FILES"""
+    directory = Path(settings.PROFILES_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    data_path, meta_path = _profile_files(profile.id)
+    data_path.write_text(json.dumps(profile.speedscope()))
+    # The summary is written last: profiles without one are incomplete and not listed
+    meta_path.write_text(json.dumps({
+        "id": profile.id,
+        "method": profile.scope["method"],
+        "path": profile.scope["path"],
+        "route": route_label(profile.scope),
+        "status_code": status_code,
+        "duration_ms": round(profile.duration * 1000, 1),
+        "samples": sum(len(samples) for samples in profile.samples.values()),
+        "created_at": profile.created_at.isoformat(),
+    }))
+    # Several workers may prune at once, hence missing_ok
+    for stale in sorted(directory.glob("*.meta.json"))[:-settings.PROFILES_MAX_FILES]:
+        stale_id = stale.name[:-len(".meta.json")]
+        for path in _profile_files(stale_id):
+            path.unlink(missing_ok=True)
+
+
+def list_profiles() -> List[dict]:
+    """Summaries of the saved profiles, newest first"""
+    directory = Path(settings.PROFILES_DIR)
+    if not directory.is_dir():
+        return []
+    summaries = []
+    for meta_path in sorted(directory.glob("*.meta.json"), reverse=True):
+        try:
+            summaries.append(json.loads(meta_path.read_text()))
+        except (OSError, ValueError):
+            # Pruned by another worker since the listing
+            continue
+    return summaries
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    """Path of a saved profile, or None if the id is malformed or unknown"""
+    if not _PROFILE_ID.match(profile_id):
+        return None
+    data_path, meta_path = _profile_files(profile_id)
+    return str(data_path) if meta_path.exists() and data_path.exists() else None
+
+
+class ProfilingMiddleware:
+    """Profiles requests that ask for it and come from an admin.
+
+    A request asking without an admin token is served normally and not
+    profiled. Profiled responses carry the profile id in `X-Profile-Id`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not profile_requested(scope):
+            return await self.app(scope, receive, send)
+        if not await run_in_threadpool(is_admin_token, Headers(scope=scope).get("authorization")):
+            return await self.app(scope, receive, send)
+
+        profile = RequestProfile(scope)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (PROFILE_ID_HEADER, profile.id.encode())]}
+            await send(message)
+
+        token = _active_profile.set(profile)
+        profile.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.stop()
+            _active_profile.reset(token)
+            try:
+                await run_in_threadpool(save_profile, profile, status_code)
+            except Exception:
+                logger.exception("Could not save profile %s", profile.id)
@@ -0,0 +1,33 @@
+import threading
+from typing import Iterable, Optional, Set
+
+
+class RevokedSessions:
+    """Emails whose access tokens are rejected without touching the database.
+
+    Filled from banned users at startup and kept current by ban/unban events,
+    including those published by other workers.
+    """
+
+    def __init__(self):
+        self._emails: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def revoke(self, email: str):
+        with self._lock:
+            self._emails.add(email)
+
+    def restore(self, email: str):
+        with self._lock:
+            self._emails.discard(email)
+
+    def replace(self, emails: Iterable[str]):
+        emails = set(emails)
+        with self._lock:
+            self._emails = emails
+
+    def is_revoked(self, email: Optional[str]) -> bool:
+        return email in self._emails
+
+
+revoked_sessions = RevokedSessions()
@@ -1,16 +1,38 @@
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.metrics import PASSWORD_HASH_QUEUE
+from app.core.revocation import revoked_sessions
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt is slow by design; capping concurrent hashes keeps a burst of logins
+# from occupying every threadpool worker, and the queue depth shows when it does
+_password_hash_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_CONCURRENCY)
+
+@contextmanager
+def _password_hash_slot():
+    waiting, running = PASSWORD_HASH_QUEUE.labels("waiting"), PASSWORD_HASH_QUEUE.labels("running")
+    waiting.inc()
+    with _password_hash_slots:
+        waiting.dec()
+        running.inc()
+        try:
+            yield
+        finally:
+            running.dec()
+
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    with _password_hash_slot():
+        return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    with _password_hash_slot():
+        return pwd_context.verify(plain_password, hashed_password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
@@ -20,8 +42,11 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 def decode_access_token(token: str):
+    """Payload of a valid token, or None if it is invalid, expired or revoked by a ban"""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
         return None
+    if revoked_sessions.is_revoked(payload.get("email")):
+        return None
+    return payload
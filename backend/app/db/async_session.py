@@ -0,0 +1,72 @@
+from typing import AsyncIterator, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from app.core.config import settings
+from app.db.engine import apply_sqlite_pragmas, postgres_server_settings, sqlite_in_memory, track_pool
+
+# Async drivers for the sync URLs in DATABASE_URL
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+_engine: Optional[AsyncEngine] = None
+_sessionmaker: Optional[async_sessionmaker] = None
+
+
+def async_database_url(database_url: str):
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+def create_async_app_engine(database_url: str) -> AsyncEngine:
+    """Async counterpart of create_app_engine, with the same pool and session tuning"""
+    url = async_database_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        in_memory = sqlite_in_memory(url)
+        engine = create_async_engine(
+            url,
+            connect_args={"timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000},
+            query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+        )
+        event.listen(
+            engine.sync_engine, "connect",
+            lambda dbapi_connection, _record: apply_sqlite_pragmas(dbapi_connection, in_memory)
+        )
+    else:
+        engine = create_async_engine(
+            url.update_query_dict({"prepared_statement_cache_size": str(settings.DB_PREPARED_STATEMENT_CACHE_SIZE)}),
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            pool_use_lifo=True,
+            query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+            connect_args={"server_settings": postgres_server_settings()}
+        )
+    track_pool(engine.sync_engine)
+    return engine
+
+
+def get_async_engine() -> AsyncEngine:
+    """Created on first use, so the async driver is only needed when the async path is enabled"""
+    global _engine, _sessionmaker
+    if _engine is None:
+        _engine = create_async_app_engine(settings.DATABASE_URL)
+        _sessionmaker = async_sessionmaker(_engine, expire_on_commit=False, autoflush=False)
+    return _engine
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    get_async_engine()
+    async with _sessionmaker() as db:
+        yield db
+
+
+async def dispose_async_engine():
+    global _engine, _sessionmaker
+    if _engine is not None:
+        await _engine.dispose()
+        _engine = _sessionmaker = None
@@ -0,0 +1,166 @@
+import threading
+import time
+import weakref
+from typing import Any, Dict
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from app.core.config import settings
+from app.core.metrics import POOL_CHECKOUT_WAIT
+
+
+class PoolMetrics:
+    """Connection pool activity counters, updated from pool events"""
+
+    def __init__(self):
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.checkout_wait_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def attach(self, engine: Engine):
+        event.listen(engine, "connect", lambda *args: self._bump("connects"))
+        event.listen(engine, "checkout", lambda *args: self._bump("checkouts"))
+        event.listen(engine, "checkin", lambda *args: self._bump("checkins"))
+        event.listen(engine, "invalidate", lambda *args: self._bump("invalidations"))
+        self._time_checkouts(engine)
+
+    def _time_checkouts(self, engine: Engine):
+        """Pool events fire only once a connection is handed out, so the wait
+        (plus opening a connection when the pool has none idle) is timed
+        around the engine's checkout; unlike the pool, the engine survives dispose()
+        """
+        raw_connection = engine.raw_connection
+        wait_histogram = POOL_CHECKOUT_WAIT.labels(engine.url.database or engine.url.host or engine.dialect.name)
+
+        def timed_raw_connection():
+            start = time.perf_counter()
+            try:
+                return raw_connection()
+            finally:
+                waited = time.perf_counter() - start
+                wait_histogram.observe(waited)
+                with self._lock:
+                    self.checkout_wait_seconds += waited
+
+        engine.raw_connection = timed_raw_connection
+
+    def _bump(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+
+_pool_metrics: "weakref.WeakKeyDictionary[Engine, PoolMetrics]" = weakref.WeakKeyDictionary()
+
+
+def sqlite_in_memory(url) -> bool:
+    return url.database in (None, "", ":memory:")
+
+
+def apply_sqlite_pragmas(dbapi_connection, in_memory: bool):
+    cursor = dbapi_connection.cursor()
+    try:
+        if not in_memory:
+            # Readers no longer block the writer, and commits skip most fsyncs
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        # Negative cache_size is in KiB rather than pages
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+
+def _sqlite_engine(url) -> Engine:
+    in_memory = sqlite_in_memory(url)
+    options: Dict[str, Any] = {}
+    if not in_memory:
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        )
+    engine = create_engine(
+        url,
+        connect_args={"timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000},
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+        **options
+    )
+
+    event.listen(engine, "connect", lambda dbapi_connection, _record: apply_sqlite_pragmas(dbapi_connection, in_memory))
+    return engine
+
+
+def postgres_server_settings() -> Dict[str, str]:
+    server_settings = {"statement_timeout": str(int(settings.DB_STATEMENT_TIMEOUT_MS))}
+    if settings.DB_IDLE_IN_TRANSACTION_TIMEOUT_MS:
+        server_settings["idle_in_transaction_session_timeout"] = str(int(settings.DB_IDLE_IN_TRANSACTION_TIMEOUT_MS))
+    return server_settings
+
+
+def _postgres_engine(url) -> Engine:
+    connect_args: Dict[str, Any] = {
+        "options": " ".join(f"-c {name}={value}" for name, value in postgres_server_settings().items())
+    }
+    if url.get_driver_name() == "psycopg":
+        # psycopg 3 prepares statements server-side once they have run this many times;
+        # psycopg2 has no prepared statements, so only SQLAlchemy's compiled cache applies
+        connect_args["prepare_threshold"] = settings.DB_PREPARE_THRESHOLD
+    return create_engine(
+        url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_use_lifo=True,
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+        connect_args=connect_args
+    )
+
+
+def create_app_engine(database_url: str) -> Engine:
+    """Create an engine tuned for the database the URL points at"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend == "sqlite":
+        engine = _sqlite_engine(url)
+    elif backend == "postgresql":
+        engine = _postgres_engine(url)
+    else:
+        engine = create_engine(url, pool_pre_ping=True)
+    track_pool(engine)
+    return engine
+
+
+def track_pool(engine: Engine):
+    metrics = PoolMetrics()
+    metrics.attach(engine)
+    _pool_metrics[engine] = metrics
+
+
+def pool_status(engine: Engine) -> Dict[str, Any]:
+    pool = engine.pool
+    status = {
+        "dialect": engine.dialect.name,
+        "driver": engine.dialect.driver,
+        "pool_class": type(pool).__name__,
+    }
+    metrics = _pool_metrics.get(engine)
+    if metrics:
+        status.update(
+            connects=metrics.connects,
+            checkouts=metrics.checkouts,
+            checkins=metrics.checkins,
+            invalidations=metrics.invalidations,
+            checkout_wait_seconds=round(metrics.checkout_wait_seconds, 6),
+        )
+    # Only QueuePool-style pools report their occupancy
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if callable(method):
+            status[name] = method()
+    return status
@@ -1,8 +1,8 @@
-from app.db.session import engine
-from app.models import Base
+from app.db.migrations import upgrade_database
 
 def init_db():
-    Base.metadata.create_all(bind=engine)
+    # The schema is owned by the Alembic migrations in migrations/
+    upgrade_database()
 
 # Optionally seed data:
 # def seed_data():
@@ -0,0 +1,23 @@
+from pathlib import Path
+from alembic import command
+from alembic.config import Config
+from app.db.session import engine
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+
+def alembic_config(connection=None) -> Config:
+    """Alembic config that works from any working directory, optionally bound to an open connection"""
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    # Leave the application's logging setup alone
+    config.attributes["configure_logger"] = False
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def upgrade_database(revision: str = "head"):
+    """Apply migrations up to `revision`; equivalent to `alembic upgrade head`"""
+    with engine.begin() as connection:
+        command.upgrade(alembic_config(connection), revision)
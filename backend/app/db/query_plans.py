@@ -0,0 +1,124 @@
+import json
+import re
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+from sqlalchemy import func, or_, select, text
+from sqlalchemy.orm import Session
+from app.models import Rating, Skill, Swap, SwapCoin, SwapStatus
+from app.models.skill import SkillStatus, SkillType
+
+_CUTOFF = datetime(2025, 1, 1)
+
+# The lookups the API and background jobs run all the time, with placeholder
+# values, and the indexes each must be served by ("a|b" when either will do,
+# such as two indexes with the same leading column). Checking for table scans
+# alone is not enough: an index on a less selective column, such as status,
+# avoids the scan but still reads a large part of the table.
+HOT_QUERIES: Dict[str, Tuple[Tuple[str, ...], Callable]] = {
+    "swaps_for_user": (
+        ("ix_swaps_from_user_id_status", "ix_swaps_to_user_id_status"),
+        lambda: select(Swap).where(or_(Swap.from_user_id == 1, Swap.to_user_id == 1)),
+    ),
+    "swaps_for_user_by_status": (
+        ("ix_swaps_from_user_id_status", "ix_swaps_to_user_id_status"),
+        lambda: select(Swap).where(
+            or_(Swap.from_user_id == 1, Swap.to_user_id == 1), Swap.status == SwapStatus.accepted
+        ),
+    ),
+    "swaps_sent_by_status": (
+        ("ix_swaps_from_user_id_status",),
+        lambda: select(Swap).where(Swap.from_user_id == 1, Swap.status == SwapStatus.pending),
+    ),
+    "swaps_received_by_status": (
+        ("ix_swaps_to_user_id_status",),
+        lambda: select(Swap).where(Swap.to_user_id == 1, Swap.status == SwapStatus.pending),
+    ),
+    "stale_pending_swaps": (
+        ("ix_swaps_pending_created_at",),
+        lambda: select(Swap.id).where(Swap.status == SwapStatus.pending, Swap.created_at < _CUTOFF)
+        .order_by(Swap.created_at).limit(100),
+    ),
+    "stale_accepted_swaps": (
+        ("ix_swaps_accepted_since",),
+        lambda: select(Swap.id).where(
+            Swap.status == SwapStatus.accepted, func.coalesce(Swap.accepted_at, Swap.created_at) < _CUTOFF
+        ).order_by(func.coalesce(Swap.accepted_at, Swap.created_at)).limit(100),
+    ),
+    "skills_for_user": (
+        ("ix_skills_user_id_type|ix_skills_user_id_status",),
+        lambda: select(Skill).where(Skill.user_id == 1),
+    ),
+    "skills_for_user_by_type": (
+        ("ix_skills_user_id_type",),
+        lambda: select(Skill).where(Skill.user_id == 1, Skill.type == SkillType.offered),
+    ),
+    "approved_skills_for_users": (
+        ("ix_skills_user_id_status",),
+        lambda: select(Skill).where(Skill.user_id.in_([1, 2, 3]), Skill.status == SkillStatus.approved),
+    ),
+    "ratings_received": (
+        ("ix_ratings_to_user_id",),
+        lambda: select(Rating).where(Rating.to_user_id == 1),
+    ),
+    "rating_for_swap_by_rater": (
+        ("uq_ratings_swap_id_from_user_id",),
+        lambda: select(Rating).where(Rating.swap_id == 1, Rating.from_user_id == 1),
+    ),
+    "ratings_for_swap": (
+        ("uq_ratings_swap_id_from_user_id",),
+        lambda: select(Rating).where(Rating.swap_id == 1),
+    ),
+    "coins_for_user": (
+        ("uq_swapcoins_user_id",),
+        lambda: select(SwapCoin).where(SwapCoin.user_id == 1),
+    ),
+}
+
+# SQLite reports full scans as "SCAN <table>"; "SCAN ... USING [COVERING] INDEX" walks an index instead
+_SQLITE_TABLE_SCAN = re.compile(r"^SCAN (\w+)(?! USING)")
+
+
+def explain(db: Session, stmt) -> List[str]:
+    """The database's plan for `stmt`, one line per plan node"""
+    compiled = stmt.compile(dialect=db.bind.dialect, compile_kwargs={"literal_binds": True})
+    if db.bind.dialect.name == "postgresql":
+        # Small tables are always cheapest to scan; ask whether an index *can* serve the query
+        db.execute(text("SET LOCAL enable_seqscan = off"))
+        plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        lines = []
+
+        def walk(node, depth=0):
+            lines.append("  " * depth + f"{node['Node Type']} {node.get('Relation Name', '')}".rstrip()
+                         + (f" USING {node['Index Name']}" if "Index Name" in node else ""))
+            for child in node.get("Plans", []):
+                walk(child, depth + 1)
+
+        walk(plan[0]["Plan"])
+        db.rollback()
+        return lines
+    return [row[3] for row in db.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))]
+
+
+def table_scans(plan: List[str]) -> List[str]:
+    """Plan lines that read a whole table"""
+    return [
+        line for line in plan
+        if _SQLITE_TABLE_SCAN.match(line.strip()) or line.strip().startswith("Seq Scan")
+    ]
+
+
+def missing_indexes(plan: List[str], indexes: Tuple[str, ...]) -> List[str]:
+    """The indexes in `indexes` that the plan does not use"""
+    return [index for index in indexes if not any(re.search(rf"\b(?:{index})\b", line) for line in plan)]
+
+
+def check_hot_queries(db: Session) -> Dict[str, List[str]]:
+    """Plan of every hot query that scans a table or skips one of its indexes, keyed by query name"""
+    failures = {}
+    for name, (indexes, build) in HOT_QUERIES.items():
+        plan = explain(db, build())
+        if table_scans(plan) or missing_indexes(plan, indexes):
+            failures[name] = plan
+    return failures
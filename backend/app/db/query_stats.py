@@ -0,0 +1,123 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+# Expanded IN lists differ in length from call to call but are the same query
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|\$\d+|:\w+)\s*,)+\s*(?:\?|%\(\w+\)s|\$\d+|:\w+)\s*\)")
+
+
+def statement_shape(statement: str) -> str:
+    return _PLACEHOLDER_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class QueryStats:
+    """Statements and database time for one request or one `capture_queries` block"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, seconds: float):
+        shape = statement_shape(statement)
+        with self._lock:
+            self.count += 1
+            self.seconds += seconds
+            self.shapes[shape] += 1
+
+    def repeated(self, threshold: Optional[int] = None) -> List[tuple]:
+        """(shape, count) for statements run at least `threshold` times: likely N+1 loops"""
+        threshold = threshold or settings.QUERY_REPEAT_THRESHOLD
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+    def server_timing(self) -> str:
+        metrics = [f'db;dur={self.seconds * 1000:.1f};desc="{self.count} queries"']
+        repeated = self.repeated()
+        if repeated:
+            metrics.append(f'db-repeated;desc="{len(repeated)} statement(s), up to {repeated[0][1]}x"')
+        return ", ".join(metrics)
+
+
+_request_stats: ContextVar[Optional[QueryStats]] = ContextVar("request_stats", default=None)
+# Blocks capturing every statement in the process, whichever thread runs it
+_captures: List[QueryStats] = []
+_captures_lock = threading.Lock()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    if _captures:
+        with _captures_lock:
+            for capture in _captures:
+                capture.record(statement, elapsed)
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_timer(context):
+    starts = context.connection.info.get("query_start") if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+
+def begin_request_stats():
+    """Start counting this request's statements; returns the stats and a token for `end_request_stats`"""
+    stats = QueryStats()
+    return stats, _request_stats.set(stats)
+
+
+def end_request_stats(stats: QueryStats, token, method: str, path: str):
+    _request_stats.reset(token)
+    for shape, n in stats.repeated():
+        logger.warning("%s %s ran the same statement %d times (possible N+1): %s", method, path, n, shape[:300])
+    if stats.count > settings.QUERY_BUDGET:
+        logger.warning("%s %s ran %d queries, over the budget of %d", method, path, stats.count, settings.QUERY_BUDGET)
+
+
+@contextmanager
+def capture_queries():
+    """Count every statement run while the block is active, including those of a
+    TestClient request served on another thread
+    """
+    stats = QueryStats()
+    with _captures_lock:
+        _captures.append(stats)
+    try:
+        yield stats
+    finally:
+        with _captures_lock:
+            _captures.remove(stats)
+
+
+@contextmanager
+def assert_max_queries(limit: int):
+    """Fail if the block runs more than `limit` statements.
+
+        with assert_max_queries(3):
+            client.get("/api/v1/swaps", headers=headers)
+    """
+    with capture_queries() as stats:
+        yield stats
+    if stats.count > limit:
+        shapes = "\n".join(f"  {n}x {shape}" for shape, n in stats.shapes.most_common())
+        raise AssertionError(f"Expected at most {limit} queries, ran {stats.count}:\n{shapes}")
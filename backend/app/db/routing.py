@@ -0,0 +1,169 @@
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.dml import UpdateBase
+from app.core.config import settings
+from app.core.security import decode_access_token
+from app.services.notifications import hub
+
+logger = logging.getLogger(__name__)
+
+# HTTP methods whose requests may be served from a replica
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+# Holds the wall-clock time until which the client's reads stay on the primary
+PIN_COOKIE = "primary_pin"
+
+
+@dataclass
+class RequestRouting:
+    # Who is making the request, for read-your-writes pinning
+    pin_keys: Tuple[str, ...]
+    read_only: bool
+    # Set by the request's sessions when they write
+    wrote: bool = False
+
+
+_request_routing: ContextVar[Optional[RequestRouting]] = ContextVar("request_routing", default=None)
+
+
+class PrimaryPins:
+    """Clients that wrote recently; their reads stay on the primary until
+    replicas have had time to catch up.
+
+    Pins are shared with other workers through hub events, which only reach
+    them with the Postgres notifications backend; the pin cookie covers
+    clients that keep cookies either way.
+    """
+
+    def __init__(self):
+        self._until: Dict[str, float] = {}
+        self._announced: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def pin(self, keys: Sequence[str], until: float):
+        with self._lock:
+            for key in keys:
+                if until > self._until.get(key, 0):
+                    self._until[key] = until
+            if len(self._until) > 10000:
+                now = time.monotonic()
+                self._until = {k: v for k, v in self._until.items() if v > now}
+
+    def announce(self, keys: Sequence[str]):
+        """Pin `keys` on the other workers too.
+
+        Called once the request is done rather than from the session, since
+        publishing on the Postgres backend needs a connection of its own. Keys
+        are only re-announced when the other workers' pins would lapse soon,
+        not on every request of a busy writer.
+        """
+        now = time.monotonic()
+        with self._lock:
+            due = [key for key in keys if self._announced.get(key, 0) - now < settings.REPLICA_PIN_SECONDS / 2]
+            for key in due:
+                self._announced[key] = now + settings.REPLICA_PIN_SECONDS
+            if len(self._announced) > 10000:
+                self._announced = {k: v for k, v in self._announced.items() if v > now}
+        if due:
+            hub.publish("primary_pinned", {"keys": due, "seconds": settings.REPLICA_PIN_SECONDS}, user_ids=[])
+
+    def is_pinned(self, keys: Sequence[str]) -> bool:
+        now = time.monotonic()
+        return any(self._until.get(key, 0) > now for key in keys)
+
+
+primary_pins = PrimaryPins()
+# Monotonic clocks differ between processes, so pins travel as a duration
+hub.add_listener("primary_pinned", lambda data: primary_pins.pin(data["keys"], time.monotonic() + data["seconds"]))
+
+if settings.DATABASE_REPLICA_URLS and settings.NOTIFICATIONS_BACKEND != "postgres":
+    logger.warning(
+        "Read replicas are configured with the %s notifications backend: read-your-writes pins are not shared "
+        "between workers, so only clients that keep the %s cookie are guaranteed to see their own writes when "
+        "running more than one worker. Set NOTIFICATIONS_BACKEND=postgres.",
+        settings.NOTIFICATIONS_BACKEND, PIN_COOKIE
+    )
+
+
+def request_pin_keys(authorization: Optional[str], client_host: Optional[str]) -> Tuple[str, ...]:
+    """Identify the client by account, or by address when it has no valid token.
+
+    The address is only used for anonymous requests such as registering:
+    using it for everyone would pin every client behind the same NAT or
+    proxy to the primary whenever one of them writes.
+    """
+    if authorization and authorization.startswith("Bearer "):
+        payload = decode_access_token(authorization.split(" ")[1])
+        if payload and payload.get("email"):
+            return (f"user:{payload['email']}",)
+    return (f"client:{client_host}",) if client_host else ()
+
+
+def pinned_by_cookie(cookie: Optional[str]) -> bool:
+    try:
+        return cookie is not None and float(cookie) > time.time()
+    except ValueError:
+        return False
+
+
+def begin_request_routing(method: str, authorization: Optional[str], client_host: Optional[str],
+                          pin_cookie: Optional[str] = None):
+    """Decide where this request's reads go; returns the routing and a token for `end_request_routing`"""
+    keys = request_pin_keys(authorization, client_host)
+    read_only = method in READ_METHODS and not pinned_by_cookie(pin_cookie) and not primary_pins.is_pinned(keys)
+    routing = RequestRouting(pin_keys=keys, read_only=read_only)
+    return routing, _request_routing.set(routing)
+
+
+def end_request_routing(token):
+    _request_routing.reset(token)
+
+
+def pin_cookie_value() -> str:
+    """Wall-clock expiry of a pin made now, for the pin cookie"""
+    return str(int(time.time() + settings.REPLICA_PIN_SECONDS) + 1)
+
+
+class RoutingSession(Session):
+    """Session that reads from a replica when the current request allows it.
+
+    Flushes, DML statements and SELECT ... FOR UPDATE always use the primary;
+    once a session has written, its later reads do too, and the client is
+    pinned to the primary for REPLICA_PIN_SECONDS: at once in this worker,
+    and through the pin cookie and a hub event when the request ends.
+    Sessions created outside a request (background jobs, scripts) only use
+    the primary.
+    """
+
+    def __init__(self, *args, replicas: Sequence[Engine] = (), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = list(replicas)
+        self.routing = _request_routing.get()
+        self.replica: Optional[Engine] = None
+        self.wrote = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        primary = super().get_bind(mapper=mapper, clause=clause, **kwargs)
+        if not self.replicas or self.routing is None:
+            return primary
+        writing = self._flushing or isinstance(clause, UpdateBase) or (
+            isinstance(clause, Select) and clause._for_update_arg is not None
+        )
+        if writing:
+            self.wrote = True
+            self.routing.wrote = True
+            primary_pins.pin(self.routing.pin_keys, time.monotonic() + settings.REPLICA_PIN_SECONDS)
+            return primary
+        if not self.routing.read_only or self.wrote:
+            return primary
+        # One replica per session, so its reads see a single consistent snapshot
+        if self.replica is None:
+            self.replica = random.choice(self.replicas)
+        return self.replica
@@ -1,6 +1,25 @@
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.engine import create_app_engine
+from app.db.routing import RoutingSession
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Pool and pragma settings depend on the database, see app/db/engine.py
+engine = create_app_engine(settings.DATABASE_URL)
+replica_engines = [create_app_engine(url) for url in settings.DATABASE_REPLICA_URLS]
+# Reads within GET requests go to a replica when any are configured, see app/db/routing.py
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=RoutingSession, replicas=replica_engines)
+
+
+def get_db():
+    """Request-scoped session, shared by every dependency of the request that asks for it.
+
+    FastAPI caches dependencies per request, so authentication and the
+    endpoint get the same session and at most one pooled connection (two when
+    reads go to a replica). The session only checks out a connection on its
+    first query, so routes that never query never touch the pool.
+    """
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
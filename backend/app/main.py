@@ -1,9 +1,46 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from app.api.v1 import admin, auth, users, skills, swaps, swapcoins
+from starlette.concurrency import run_in_threadpool
+from app.api.v1 import admin, async_routes, auth, users, skills, swaps, swapcoins, events, messages
+from app.core.config import settings
+from app.core.metrics import MetricsMiddleware, mark_worker_stopped, render_metrics
+from app.core.profiling import ProfilingMiddleware
+from app.db.async_session import dispose_async_engine
+from app.db.query_stats import begin_request_stats, end_request_stats
+from app.db.routing import PIN_COOKIE, begin_request_routing, end_request_routing, pin_cookie_value, primary_pins
+from app.services.bans import load_revoked_sessions
+from app.services.counters import run_counter_reconciler
+from app.services.report_jobs import run_report_job_monitor
+from app.services.notifications import hub, build_backend
+from app.services.rollups import run_rollup_job
+from app.services.swap_sweeper import run_swap_sweeper
 
-app = FastAPI(title="Skill Swap Platform API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await hub.start(build_backend())
+    await asyncio.to_thread(load_revoked_sessions)
+    # Background tasks
+    stop_event = asyncio.Event()
+    tasks = []
+    if settings.SWAP_SWEEPER_ENABLED:
+        tasks.append(asyncio.create_task(run_swap_sweeper(stop_event)))
+    if settings.COUNTERS_RECONCILE_ENABLED:
+        tasks.append(asyncio.create_task(run_counter_reconciler(stop_event)))
+    if settings.REPORT_JOB_MONITOR_ENABLED:
+        tasks.append(asyncio.create_task(run_report_job_monitor(stop_event)))
+    if settings.ROLLUPS_ENABLED:
+        tasks.append(asyncio.create_task(run_rollup_job(stop_event)))
+    yield
+    stop_event.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await hub.stop()
+    await dispose_async_engine()
+    mark_worker_stopped()
+
+app = FastAPI(title="Skill Swap Platform API", lifespan=lifespan)
 
 # Middleware
 app.add_middleware(
@@ -14,17 +51,68 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.DATABASE_REPLICA_URLS:
+    @app.middleware("http")
+    async def route_reads(request: Request, call_next):
+        routing, token = begin_request_routing(
+            request.method, request.headers.get("authorization"), request.client.host if request.client else None,
+            request.cookies.get(PIN_COOKIE)
+        )
+        try:
+            response = await call_next(request)
+        finally:
+            end_request_routing(token)
+        if routing.wrote:
+            # Publishing the pin may need a database connection, so it waits until the request is done
+            await run_in_threadpool(primary_pins.announce, routing.pin_keys)
+            response.set_cookie(PIN_COOKIE, pin_cookie_value(), max_age=int(settings.REPLICA_PIN_SECONDS) + 1, httponly=True)
+        return response
+
+if settings.QUERY_STATS_ENABLED:
+    @app.middleware("http")
+    async def count_queries(request: Request, call_next):
+        stats, token = begin_request_stats()
+        try:
+            response = await call_next(request)
+        finally:
+            end_request_stats(stats, token, request.method, request.url.path)
+        # Statements run while a streaming body is sent are not included
+        response.headers.append("Server-Timing", stats.server_timing())
+        return response
+
+if settings.METRICS_ENABLED:
+    # Added last so it is outermost and its timings include the other middleware
+    app.add_middleware(MetricsMiddleware)
+
+if settings.PROFILING_ENABLED:
+    # Outermost, so a profile covers the other middleware too
+    app.add_middleware(ProfilingMiddleware)
+
 # Mount static files for uploaded photos
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 
 # Register Routers
+if settings.ASYNC_DB_MODE == "on":
+    # Registered first so these paths resolve to the async versions
+    app.include_router(async_routes.router, prefix="/api/v1")
+elif settings.ASYNC_DB_MODE == "shadow":
+    app.include_router(async_routes.router, prefix="/api/v1/async")
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(users.router, prefix="/api/v1")
 app.include_router(skills.router, prefix="/api/v1")
 app.include_router(swaps.router, prefix="/api/v1")
 app.include_router(swapcoins.router, prefix="/api/v1")
+app.include_router(events.router, prefix="/api/v1")
+app.include_router(messages.router, prefix="/api/v1")
 app.include_router(admin.admin_router, prefix="/api/v1")
 
 @app.get("/")
 def root():
     return {"message": "Skill Swap Backend is Running ✅"}
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        """Prometheus scrape endpoint"""
+        body, content_type = render_metrics()
+        return Response(content=body, headers={"Content-Type": content_type})
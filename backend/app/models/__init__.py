@@ -5,5 +5,12 @@ from .swap import Swap, SwapStatus
 from .rating import Rating
 from .swapcoin import SwapCoin
 from .platform_message import PlatformMessage
+from .user_rating import UserRating
+from .platform_counter import PlatformCounter
+from .report_job import ReportJob
+from .daily_rollup import DailyRollup, RollupWatermark
 
-__all__ = ["Base", "User", "Skill", "Swap", "SwapStatus", "Rating", "SwapCoin", "PlatformMessage"] 
\ No newline at end of file
+__all__ = [
+    "Base", "User", "Skill", "Swap", "SwapStatus", "Rating", "SwapCoin", "PlatformMessage",
+    "UserRating", "PlatformCounter", "ReportJob", "DailyRollup", "RollupWatermark"
+] 
\ No newline at end of file
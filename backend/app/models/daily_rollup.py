@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime
+from sqlalchemy.sql import func
+from app.models.base import Base
+
+class DailyRollup(Base):
+    """Per-day activity totals, filled incrementally by the rollup job"""
+    __tablename__ = "daily_rollups"
+
+    metric = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+class RollupWatermark(Base):
+    """Last day the rollup job has fully aggregated"""
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String, primary_key=True)
+    last_day = Column(Date, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, true
 from sqlalchemy.sql import func
 from app.models.base import Base
 
@@ -11,4 +11,4 @@ class PlatformMessage(Base):
     message_type = Column(String, default="info")  # info, warning, error, success
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     created_by = Column(Integer, nullable=True)  # admin user id
-    is_active = Column(String, default=True) 
\ No newline at end of file
+    is_active = Column(Boolean, nullable=False, default=True, server_default=true(), index=True) 
\ No newline at end of file
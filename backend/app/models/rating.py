@@ -1,9 +1,15 @@
-from sqlalchemy import Column, Integer, ForeignKey, String
+from sqlalchemy import Column, Integer, ForeignKey, String, DateTime, Index
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
 from app.models.base import Base
 
 class Rating(Base):
     __tablename__ = "ratings"
+    __table_args__ = (
+        # One rating per rater per swap
+        Index("uq_ratings_swap_id_from_user_id", "swap_id", "from_user_id", unique=True),
+        Index("ix_ratings_to_user_id", "to_user_id"),
+    )
 
     id = Column(Integer, primary_key=True)
     swap_id = Column(Integer, ForeignKey("swaps.id"))
@@ -11,6 +17,7 @@ class Rating(Base):
     to_user_id = Column(Integer, ForeignKey("users.id"))
     stars = Column(Integer, nullable=False)
     feedback = Column(String)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     rater = relationship("User", foreign_keys=[from_user_id], back_populates="ratings_given")
     ratee = relationship("User", foreign_keys=[to_user_id], back_populates="ratings_received")
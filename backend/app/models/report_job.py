@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Index, text
+from sqlalchemy.sql import func
+from app.models.base import Base
+
+class ReportJob(Base):
+    __tablename__ = "report_jobs"
+    __table_args__ = (
+        # One queued or running job per set of report parameters
+        Index(
+            "uq_report_jobs_active_params_hash",
+            "params_hash",
+            unique=True,
+            sqlite_where=text("status IN ('queued', 'running')"),
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+    )
+
+    id = Column(String(32), primary_key=True)
+    # Hash of the report parameters, used to deduplicate identical requests
+    params_hash = Column(String(64), nullable=False, index=True)
+    report_type = Column(String, nullable=False)
+    format = Column(String, nullable=False)
+    gzip = Column(Boolean, default=False)
+    start_date = Column(DateTime, nullable=True)
+    end_date = Column(DateTime, nullable=True)
+    status = Column(String, nullable=False, default="queued")  # queued, running, completed, failed, cancelled, expired
+    rows_total = Column(Integer, nullable=True)
+    rows_written = Column(Integer, default=0)
+    file_path = Column(String, nullable=True)
+    error = Column(Text, nullable=True)
+    created_by = Column(Integer, nullable=True)  # admin user id
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    # Refreshed by the worker holding the job; see check_job_heartbeats
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
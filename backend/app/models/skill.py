@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Enum, DateTime
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, ForeignKey, Enum, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.models.base import Base
@@ -20,6 +21,15 @@ class SkillStatus(str, enum.Enum):
 
 class Skill(Base):
     __tablename__ = "skills"
+    __table_args__ = (
+        # Admin listings filtered by status, newest first
+        Index("ix_skills_status_created_at", "status", "created_at"),
+        # Moderation queue order
+        Index("ix_skills_moderation_queue", "status", "moderation_priority", "created_at", "id"),
+        # A user's skills, optionally by type or status
+        Index("ix_skills_user_id_type", "user_id", "type"),
+        Index("ix_skills_user_id_status", "user_id", "status"),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -27,7 +37,13 @@ class Skill(Base):
     type = Column(Enum(SkillType), nullable=False)
     level = Column(Enum(SkillLevel), nullable=False)
     status = Column(Enum(SkillStatus), default=SkillStatus.approved)
-    # Make this optional to handle database migration
-    created_at = Column(DateTime(timezone=True), nullable=True)
+    # Required: the moderation queue and admin listings page on it
+    created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+    # Moderation queue: lower priority values are reviewed first; an admin's
+    # claim on a pending skill lapses at claim_expires_at
+    moderation_priority = Column(Integer, nullable=False, default=1, server_default="1")
+    moderation_reason = Column(String, nullable=True)
+    claimed_by = Column(Integer, nullable=True)  # admin user id
+    claim_expires_at = Column(DateTime, nullable=True)
 
     user = relationship("User", back_populates="skills")
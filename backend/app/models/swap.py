@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, ForeignKey, Enum
+from sqlalchemy import Column, Integer, ForeignKey, Enum, Index, DateTime, text
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
 from app.models.base import Base
 import enum
 
@@ -9,9 +10,44 @@ class SwapStatus(str, enum.Enum):
     rejected = "rejected"
     cancelled = "cancelled"
     completed = "completed"
+    expired = "expired"
+
+def status_timestamp(swap_status: SwapStatus) -> str:
+    """Name of the column recording when a swap entered `swap_status`"""
+    return f"{SwapStatus(swap_status).value}_at"
+
+def swap_status_values(new_status: SwapStatus) -> dict:
+    """Values for an UPDATE moving swaps into `new_status`, stamping when they got there"""
+    return {"status": new_status, status_timestamp(new_status): func.now()}
 
 class Swap(Base):
     __tablename__ = "swaps"
+    __table_args__ = (
+        # Only one pending request may exist for the same users and skills
+        Index(
+            "uq_swaps_pending_request",
+            "from_user_id", "to_user_id", "skill_offered_id", "skill_requested_id",
+            unique=True,
+            sqlite_where=text("status = 'pending'"),
+            postgresql_where=text("status = 'pending'"),
+        ),
+        # Used by the stale swap sweeper. Partial, so that per-user lookups by
+        # status are not planned as a walk over every swap in that status
+        Index(
+            "ix_swaps_pending_created_at", "created_at",
+            sqlite_where=text("status = 'pending'"),
+            postgresql_where=text("status = 'pending'"),
+        ),
+        # Accepted swaps age from when they were accepted
+        Index(
+            "ix_swaps_accepted_since", text("coalesce(accepted_at, created_at)"),
+            sqlite_where=text("status = 'accepted'"),
+            postgresql_where=text("status = 'accepted'"),
+        ),
+        # A user's swaps, optionally by status, from either side
+        Index("ix_swaps_from_user_id_status", "from_user_id", "status"),
+        Index("ix_swaps_to_user_id_status", "to_user_id", "status"),
+    )
 
     id = Column(Integer, primary_key=True)
     from_user_id = Column(Integer, ForeignKey("users.id"))
@@ -19,6 +55,14 @@ class Swap(Base):
     skill_offered_id = Column(Integer, ForeignKey("skills.id"))
     skill_requested_id = Column(Integer, ForeignKey("skills.id"))
     status = Column(Enum(SwapStatus), default=SwapStatus.pending)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # When the swap entered each later status; a swap enters each one at most once
+    accepted_at = Column(DateTime(timezone=True), nullable=True)
+    rejected_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    cancelled_at = Column(DateTime(timezone=True), nullable=True)
+    expired_at = Column(DateTime(timezone=True), nullable=True)
 
     sender = relationship("User", foreign_keys=[from_user_id], back_populates="swaps_sent")
     receiver = relationship("User", foreign_keys=[to_user_id], back_populates="swaps_received")
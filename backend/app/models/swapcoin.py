@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 
 class SwapCoin(Base):
     __tablename__ = "swapcoins"
+    __table_args__ = (
+        # One balance per user
+        Index("uq_swapcoins_user_id", "user_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"))
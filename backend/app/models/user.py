@@ -1,3 +1,4 @@
+from datetime import datetime
 from sqlalchemy import Column, Integer, String, Boolean, DateTime
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -17,7 +18,7 @@ class User(Base):
     is_admin = Column(Boolean, default=False)
     is_banned = Column(Boolean, default=False)
     # Make these optional to handle database migration issues
-    created_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, nullable=True, default=datetime.utcnow)
     last_login = Column(DateTime, nullable=True)
 
     # Relationships
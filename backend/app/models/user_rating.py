@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey
+from sqlalchemy.orm import relationship
+from app.models.base import Base
+
+class UserRating(Base):
+    """Running rating aggregates per user, maintained by rate_swap"""
+    __tablename__ = "user_rating_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    rating_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0)
+    # Star histogram
+    stars_1 = Column(Integer, nullable=False, default=0)
+    stars_2 = Column(Integer, nullable=False, default=0)
+    stars_3 = Column(Integer, nullable=False, default=0)
+    stars_4 = Column(Integer, nullable=False, default=0)
+    stars_5 = Column(Integer, nullable=False, default=0)
+    # Average shrunk towards the platform prior; used for ranking
+    bayesian_average = Column(Float, nullable=False, index=True)
+
+    user = relationship("User")
+
+    @property
+    def average(self) -> float:
+        return self.rating_sum / self.rating_count if self.rating_count else 0.0
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 
 class AdminAction(str, Enum):
@@ -25,6 +25,7 @@ class SwapStatus(str, Enum):
     REJECTED = "rejected"
     CANCELLED = "cancelled"
     COMPLETED = "completed"
+    EXPIRED = "expired"
 
 class AdminUserResponse(BaseModel):
     id: int
@@ -57,6 +58,18 @@ class AdminSkillResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class ModerationQueueItem(AdminSkillResponse):
+    moderation_priority: int = 1  # lower is reviewed first
+    moderation_reason: Optional[str] = None
+    claimed_by: Optional[int] = None
+    claim_expires_at: Optional[datetime] = None
+
+class ModerationClaimRequest(BaseModel):
+    limit: int = Field(10, ge=1, le=100)
+
+class ModerationReleaseRequest(BaseModel):
+    skill_ids: Optional[List[int]] = None  # all of the admin's claims when omitted
+
 class AdminSwapResponse(BaseModel):
     id: int
     from_user_id: int
@@ -88,6 +101,24 @@ class RejectSkillRequest(BaseModel):
 class ApproveSkillRequest(BaseModel):
     skill_id: int
 
+class SkillBulkAction(str, Enum):
+    APPROVE = "approve"
+    REJECT = "reject"
+
+class SkillBulkRequest(BaseModel):
+    skill_ids: List[int] = Field(..., min_length=1, max_length=500, description="Skills to moderate")
+    action: SkillBulkAction
+
+class SkillBulkItemResult(BaseModel):
+    skill_id: int
+    success: bool
+    status: Optional[SkillStatus] = None
+    detail: Optional[str] = None
+
+class SkillBulkResponse(BaseModel):
+    processed: int
+    results: List[SkillBulkItemResult]
+
 class PlatformMessageRequest(BaseModel):
     title: str
     message: str
@@ -109,10 +140,52 @@ class ReportRequest(BaseModel):
     report_type: str  # users, swaps, skills, ratings
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
-    format: str = "json"  # json, csv
+    format: str = "json"  # json, csv, ndjson, parquet, arrow
+    gzip: bool = False
+    background: bool = False  # run as a job instead of streaming the response
+
+class ReportJobResponse(BaseModel):
+    id: str
+    report_type: str
+    format: str
+    gzip: bool
+    status: str  # queued, running, completed, failed, cancelled, expired
+    rows_total: Optional[int] = None
+    rows_written: int = 0
+    progress: Optional[float] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    download_url: Optional[str] = None
 
 class AdminDashboardResponse(BaseModel):
     stats: AdminStatsResponse
     recent_users: List[AdminUserResponse]
     recent_swaps: List[AdminSwapResponse]
-    pending_skills: List[AdminSkillResponse] 
\ No newline at end of file
+    pending_skills: List[AdminSkillResponse]
+
+class RequestProfileResponse(BaseModel):
+    id: str
+    method: str
+    path: str
+    route: str  # route template, e.g. /api/v1/swaps/{swap_id}
+    status_code: int
+    duration_ms: float
+    samples: int
+    created_at: datetime
+    download_url: str
+
+class TimeSeriesPoint(BaseModel):
+    period: date  # first day of the day/week/month
+    value: Optional[float] = None
+
+class TimeSeries(BaseModel):
+    metric: str
+    points: List[TimeSeriesPoint]
+
+class TimeSeriesResponse(BaseModel):
+    granularity: str
+    start_date: date
+    end_date: date
+    complete_through: Optional[date] = None  # last day included in the rollups
+    series: List[TimeSeries]
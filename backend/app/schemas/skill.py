@@ -22,6 +22,7 @@ class SkillCreate(SkillBase):
 class SkillResponse(SkillBase):
     id: int
     user_id: int
+    status: Optional[str] = None  # pending while waiting for moderation
 
     class Config:
         orm_mode = True
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
 
 class SwapStatus(str, Enum):
     pending = "pending"
@@ -8,6 +8,7 @@ class SwapStatus(str, Enum):
     rejected = "rejected"
     cancelled = "cancelled"
     completed = "completed"
+    expired = "expired"
 
 class SwapBase(BaseModel):
     from_user_id: int
@@ -44,3 +45,21 @@ class SwapDetailResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+class SwapBulkAction(str, Enum):
+    accept = "accept"
+    reject = "reject"
+
+class SwapBulkRequest(BaseModel):
+    swap_ids: List[int] = Field(..., min_length=1, max_length=500, description="Swaps to act on")
+    action: SwapBulkAction
+
+class SwapBulkItemResult(BaseModel):
+    swap_id: int
+    success: bool
+    status: Optional[SwapStatus] = None
+    detail: Optional[str] = None
+
+class SwapBulkResponse(BaseModel):
+    processed: int
+    results: List[SwapBulkItemResult]
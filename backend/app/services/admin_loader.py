@@ -0,0 +1,61 @@
+from typing import Dict, Iterable, Optional
+from sqlalchemy.orm import Session
+from app.models import User, Skill
+
+# Keep IN lists well below driver/database parameter limits
+BATCH_SIZE = 500
+
+
+class AdminLoader:
+    """Resolves user and skill display data for admin listings and reports.
+
+    Ids are loaded with batched IN queries and kept in an identity cache for the
+    lifetime of the loader, so a listing costs a constant number of queries
+    instead of one per row. Create one per request.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._users: Dict[int, Optional[tuple]] = {}
+        self._skills: Dict[int, Optional[str]] = {}
+
+    def load_users(self, user_ids: Iterable[Optional[int]]):
+        missing = {i for i in user_ids if i is not None and i not in self._users}
+        for chunk in _chunks(missing):
+            self._users.update(dict.fromkeys(chunk))
+            rows = self.db.query(User.id, User.name, User.email).filter(User.id.in_(chunk)).all()
+            self._users.update({row.id: (row.name, row.email) for row in rows})
+
+    def load_skills(self, skill_ids: Iterable[Optional[int]]):
+        missing = {i for i in skill_ids if i is not None and i not in self._skills}
+        for chunk in _chunks(missing):
+            self._skills.update(dict.fromkeys(chunk))
+            rows = self.db.query(Skill.id, Skill.name).filter(Skill.id.in_(chunk)).all()
+            self._skills.update({row.id: row.name for row in rows})
+
+    def load_for_swaps(self, swaps):
+        self.load_users([s.from_user_id for s in swaps] + [s.to_user_id for s in swaps])
+        self.load_skills([s.skill_offered_id for s in swaps] + [s.skill_requested_id for s in swaps])
+
+    def load_for_ratings(self, ratings):
+        self.load_users([r.from_user_id for r in ratings] + [r.to_user_id for r in ratings])
+
+    def load_for_skills(self, skills):
+        self.load_users([s.user_id for s in skills])
+
+    def user_name(self, user_id: Optional[int], default: str = "Unknown") -> str:
+        user = self._users.get(user_id)
+        return user[0] if user else default
+
+    def user_email(self, user_id: Optional[int], default: str = "Unknown") -> str:
+        user = self._users.get(user_id)
+        return user[1] if user else default
+
+    def skill_name(self, skill_id: Optional[int], default: str = "Unknown") -> str:
+        return self._skills.get(skill_id) or default
+
+
+def _chunks(ids):
+    ids = sorted(ids)
+    for start in range(0, len(ids), BATCH_SIZE):
+        yield ids[start:start + BATCH_SIZE]
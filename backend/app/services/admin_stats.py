@@ -0,0 +1,31 @@
+from sqlalchemy.orm import Session
+from app.core.cache import SnapshotCache
+from app.core.config import settings
+from app.schemas.admin import AdminStatsResponse
+from app.services.counters import read_counters
+
+platform_stats_cache = SnapshotCache(ttl=settings.ADMIN_STATS_TTL_SECONDS, name="platform_stats")
+
+
+def compute_platform_stats(db: Session) -> AdminStatsResponse:
+    """Build platform stats from the write-maintained counters in one small read"""
+    counters = read_counters(db)
+    total_ratings = counters["ratings_total"]
+
+    return AdminStatsResponse(
+        total_users=counters["users_total"],
+        active_users=counters["users_total"] - counters["users_banned"],
+        banned_users=counters["users_banned"],
+        total_swaps=counters["swaps_total"],
+        pending_swaps=counters["swaps_pending"],
+        completed_swaps=counters["swaps_completed"],
+        total_skills=counters["skills_total"],
+        pending_skills=counters["skills_pending"],
+        total_ratings=total_ratings,
+        average_rating=counters["ratings_stars"] / total_ratings if total_ratings else 0.0
+    )
+
+
+def get_platform_stats(db: Session) -> AdminStatsResponse:
+    """Platform stats served from a short-lived snapshot"""
+    return platform_stats_cache.get(lambda: compute_platform_stats(db))
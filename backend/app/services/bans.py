@@ -0,0 +1,74 @@
+from typing import Dict
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+from app.core.revocation import revoked_sessions
+from app.db.session import SessionLocal
+from app.models import User, Swap, SwapStatus
+from app.models.swap import swap_status_values
+from app.services.counters import adjust_counters, swap_status_counter
+from app.services.notifications import hub
+
+# Swaps still in flight when a participant is banned
+OPEN_SWAP_STATUSES = (SwapStatus.pending, SwapStatus.accepted)
+
+
+def ban_user(db: Session, user: User) -> Dict[str, int]:
+    """Ban a user and cancel their open swaps in one transaction.
+
+    Returns the number of swaps cancelled per previous status. After the
+    commit the user's tokens are revoked on every worker and the other
+    party of each cancelled swap is notified.
+    """
+    cancelled = {}
+    notifications = []
+    for old_status in OPEN_SWAP_STATUSES:
+        rows = db.execute(
+            update(Swap)
+            .where(or_(Swap.from_user_id == user.id, Swap.to_user_id == user.id), Swap.status == old_status)
+            .values(**swap_status_values(SwapStatus.cancelled))
+            .returning(Swap.id, Swap.from_user_id, Swap.to_user_id)
+        ).all()
+        cancelled[old_status.value] = len(rows)
+        notifications.extend(rows)
+
+    deltas = {swap_status_counter(s): -cancelled[s.value] for s in OPEN_SWAP_STATUSES}
+    deltas[swap_status_counter(SwapStatus.cancelled)] = len(notifications)
+    if not user.is_banned:
+        deltas["users_banned"] = 1
+    user.is_banned = True
+    adjust_counters(db, deltas)
+    db.commit()
+
+    revoked_sessions.revoke(user.email)
+    # Empty recipient list: no SSE frames, but every worker's listeners run
+    hub.publish("user_banned", {"user_id": user.id, "email": user.email}, [])
+    hub.publish("session_revoked", {"reason": "banned"}, [user.id])
+    for swap_id, from_user_id, to_user_id in notifications:
+        other = to_user_id if from_user_id == user.id else from_user_id
+        hub.publish("swap_cancelled", {"swap_id": swap_id, "reason": "participant_banned"}, [other])
+    return cancelled
+
+
+def unban_user(db: Session, user: User):
+    if user.is_banned:
+        adjust_counters(db, {"users_banned": -1})
+    user.is_banned = False
+    db.commit()
+
+    revoked_sessions.restore(user.email)
+    hub.publish("user_unbanned", {"user_id": user.id, "email": user.email}, [])
+
+
+def load_revoked_sessions() -> int:
+    """Seed the revocation list from the banned users"""
+    db = SessionLocal()
+    try:
+        emails = [email for (email,) in db.query(User.email).filter(User.is_banned == True)]
+    finally:
+        db.close()
+    revoked_sessions.replace(emails)
+    return len(emails)
+
+
+hub.add_listener("user_banned", lambda data: revoked_sessions.revoke(data["email"]))
+hub.add_listener("user_unbanned", lambda data: revoked_sessions.restore(data["email"]))
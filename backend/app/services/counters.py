@@ -0,0 +1,136 @@
+import asyncio
+import logging
+from typing import Dict
+from sqlalchemy import func, case, false, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models import User, Skill, Swap, SwapStatus, Rating, PlatformCounter
+from app.models.skill import SkillStatus
+
+logger = logging.getLogger(__name__)
+
+KNOWN_COUNTERS = (
+    ["users_total", "users_banned", "swaps_total", "skills_total", "ratings_total", "ratings_stars"]
+    + [f"swaps_{s.value}" for s in SwapStatus]
+    + [f"skills_{s.value}" for s in SkillStatus]
+)
+
+
+def swap_status_counter(swap_status) -> str:
+    return f"swaps_{SwapStatus(swap_status).value}"
+
+
+def skill_status_counter(skill_status) -> str:
+    return f"skills_{SkillStatus(skill_status).value}"
+
+
+def status_change_deltas(prefix: str, old_status, new_status) -> Dict[str, int]:
+    """Counter deltas for moving one row from `old_status` to `new_status`"""
+    deltas = {}
+    if old_status is not None:
+        deltas[f"{prefix}_{old_status.value}"] = -1
+    deltas[f"{prefix}_{new_status.value}"] = deltas.get(f"{prefix}_{new_status.value}", 0) + 1
+    return deltas
+
+
+def adjust_counters(db: Session, deltas: Dict[str, int]):
+    """Apply counter deltas inside the caller's transaction without committing.
+
+    Each counter is bumped with an atomic in-place UPDATE; missing rows are
+    created on first use.
+    """
+    for name, delta in deltas.items():
+        if not delta:
+            continue
+        updated = db.query(PlatformCounter).filter(PlatformCounter.name == name).update(
+            {PlatformCounter.value: PlatformCounter.value + delta}, synchronize_session=False
+        )
+        if updated:
+            continue
+        try:
+            with db.begin_nested():
+                db.add(PlatformCounter(name=name, value=delta))
+        except IntegrityError:
+            # Another request created the row first
+            adjust_counters(db, {name: delta})
+
+
+def read_counters(db: Session) -> Dict[str, int]:
+    values = dict.fromkeys(KNOWN_COUNTERS, 0)
+    values.update(db.query(PlatformCounter.name, PlatformCounter.value).all())
+    return values
+
+
+def count_actual_totals(db: Session) -> Dict[str, int]:
+    """Recount every counter from the source tables (expensive; used for reconciliation)"""
+    totals = dict.fromkeys(KNOWN_COUNTERS, 0)
+
+    users_total, users_banned = db.query(
+        func.count(User.id), func.coalesce(func.sum(case((User.is_banned == True, 1), else_=0)), 0)
+    ).one()
+    totals.update(users_total=users_total, users_banned=users_banned)
+
+    for swap_status, count in db.query(Swap.status, func.count(Swap.id)).group_by(Swap.status).all():
+        totals["swaps_total"] += count
+        if swap_status is not None:
+            totals[swap_status_counter(swap_status)] = count
+
+    for skill_status, count in db.query(Skill.status, func.count(Skill.id)).group_by(Skill.status).all():
+        totals["skills_total"] += count
+        if skill_status is not None:
+            totals[skill_status_counter(skill_status)] = count
+
+    ratings_total, ratings_stars = db.query(func.count(Rating.id), func.coalesce(func.sum(Rating.stars), 0)).one()
+    totals.update(ratings_total=ratings_total, ratings_stars=ratings_stars)
+    return totals
+
+
+def lock_counters(db: Session):
+    """Hold off counter writers until the caller's transaction ends.
+
+    Writers bump counters in the same transaction as the rows they count, so
+    once this returns, every committed row is reflected in the stored values
+    and no new one can commit until we do.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        # No row locks in SQLite; any write statement takes the database write lock
+        db.execute(update(PlatformCounter).where(false()).values(value=PlatformCounter.value))
+    else:
+        db.query(PlatformCounter.name).with_for_update().all()
+
+
+def reconcile_counters(db: Session) -> Dict[str, int]:
+    """Repair counters that drifted from the source tables, returning the drift per counter"""
+    # Without the lock, a row written between the recount and the read of the
+    # stored values would look like drift and be counted twice
+    lock_counters(db)
+    actual = count_actual_totals(db)
+    stored = read_counters(db)
+    drift = {name: actual[name] - stored[name] for name in KNOWN_COUNTERS if actual[name] != stored[name]}
+    if drift:
+        logger.warning("Repairing platform counter drift: %s", drift)
+        adjust_counters(db, drift)
+    db.commit()
+    return drift
+
+
+async def run_counter_reconciler(stop_event: asyncio.Event):
+    """Reconcile counters every COUNTERS_RECONCILE_INTERVAL_SECONDS until `stop_event` is set"""
+    def reconcile_once():
+        db = SessionLocal()
+        try:
+            reconcile_counters(db)
+        finally:
+            db.close()
+
+    while not stop_event.is_set():
+        try:
+            await asyncio.to_thread(reconcile_once)
+        except Exception:
+            logger.exception("Platform counter reconciliation failed")
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=settings.COUNTERS_RECONCILE_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,202 @@
+import logging
+import re
+import unicodedata
+from collections import deque
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Pattern
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Moderation queue priorities; lower values are reviewed first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+
+# Common character substitutions used to dodge filters
+_LEET = str.maketrans({"0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t", "@": "a", "$": "s"})
+# Characters with a meaning of their own in a regex, outside of an escape
+_REGEX_SPECIAL = set(".^$*+?{}[]|()\\")
+
+
+def normalize(text: str) -> str:
+    return unicodedata.normalize("NFKC", text).casefold().translate(_LEET)
+
+
+def _has_top_level_alternation(pattern: str) -> bool:
+    depth, in_class, escaped = 0, False, False
+    for char in pattern:
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return True
+    return False
+
+
+def literal_prefix(pattern: str) -> str:
+    """The text every match of `pattern` starts with, or "" if it has none.
+
+    Only plain characters and escaped punctuation count; a character made
+    optional or repeatable by a quantifier ends the prefix.
+    """
+    if _has_top_level_alternation(pattern):
+        return ""
+    prefix = []
+    i = 0
+    while i < len(pattern):
+        char, step = pattern[i], 1
+        if char == "\\":
+            escaped = pattern[i + 1:i + 2]
+            if not escaped or escaped.isalnum() or escaped == "_":
+                # \b, \d, \1, ... are not literal text
+                break
+            char, step = escaped, 2
+        elif char in _REGEX_SPECIAL:
+            break
+        quantifier = pattern[i + step:i + step + 1]
+        if quantifier and quantifier in "*?{":
+            break
+        prefix.append(char)
+        if quantifier == "+":
+            break
+        i += step
+    return "".join(prefix)
+
+
+class Automaton:
+    """Aho-Corasick automaton: finds every term in one pass over the text,
+    however many terms there are.
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+        for term in terms:
+            self._add(term)
+        self._link()
+
+    def _add(self, term: str):
+        node = 0
+        for char in term:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        self._output[node].append(term)
+
+    def _link(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find(self, text: str) -> List[str]:
+        matches = []
+        node = 0
+        for char in text:
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            matches.extend(self._output[node])
+        return matches
+
+
+class SkillModerator:
+    """Screens skill names against a blocklist of plain terms and regexes.
+
+    Terms are matched as substrings of the normalized name by an automaton.
+    The regexes are compiled one by one: joined into a single alternation,
+    group numbers shift and a backreference like `\\1` would point into
+    another entry's groups. A regex with a literal prefix (`https?://`
+    starts with "http") only runs when a second automaton finds that prefix
+    in the name, so those cost one pass however many there are.
+
+    Regexes without a literal prefix, such as `(.)\\1{5,}`, still run on
+    every name, one after another: keep them few.
+    """
+
+    def __init__(self, terms: Iterable[str], patterns: Iterable[str] = ()):
+        self.automaton = Automaton({normalize(t) for t in terms if t.strip()})
+        self.patterns: List[Pattern] = []
+        self.unprefixed: List[int] = []
+        # casefolded literal prefix -> indexes into self.patterns
+        self.prefixed: Dict[str, List[int]] = {}
+        for index, pattern in enumerate(patterns):
+            self.patterns.append(re.compile(pattern, re.IGNORECASE))
+            prefix = literal_prefix(pattern).casefold()
+            if prefix:
+                self.prefixed.setdefault(prefix, []).append(index)
+            else:
+                self.unprefixed.append(index)
+        self.prefixes = Automaton(self.prefixed)
+
+    def screen(self, name: str) -> List[str]:
+        """Return the blocklist entries the name matches; empty means clean"""
+        text = normalize(name)
+        reasons = list(dict.fromkeys(self.automaton.find(text)))
+        # Regexes are tried on the normalized and the original name, so look for prefixes in both
+        candidates = set(self.unprefixed)
+        for prefix in self.prefixes.find(text) + self.prefixes.find(name.casefold()):
+            candidates.update(self.prefixed[prefix])
+        for index in sorted(candidates):
+            pattern = self.patterns[index]
+            match = pattern.search(text) or pattern.search(name)
+            if match:
+                reasons.append(match.group(0))
+        return reasons
+
+
+def load_blocklist(path: str) -> SkillModerator:
+    """One entry per line; `re:` marks a regular expression and `#` starts a comment"""
+    terms, patterns = [], []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("re:"):
+            patterns.append(line[3:].strip())
+        else:
+            terms.append(line)
+    return SkillModerator(terms, patterns)
+
+
+@lru_cache(maxsize=1)
+def get_moderator() -> Optional[SkillModerator]:
+    try:
+        return load_blocklist(settings.MODERATION_BLOCKLIST_PATH)
+    except OSError:
+        logger.exception("Could not load the moderation blocklist; new skills will not be screened")
+        return None
+
+
+def screen_skill_name(name: str) -> List[str]:
+    """Blocklist entries a new skill name matches; any match sends it to the moderation queue"""
+    if not settings.MODERATION_ENABLED:
+        return []
+    moderator = get_moderator()
+    return moderator.screen(name) if moderator else []
+
+
+def review_priority(reasons: List[str]) -> int:
+    return PRIORITY_HIGH if len(reasons) > 1 else PRIORITY_NORMAL
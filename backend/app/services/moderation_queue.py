@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence
+from sqlalchemy import or_, select, tuple_, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models import Skill, User
+from app.models.skill import SkillStatus
+
+# Served by ix_skills_moderation_queue (status, moderation_priority, created_at, id)
+QUEUE_ORDER = (Skill.moderation_priority, Skill.created_at, Skill.id)
+
+
+def _claimable(admin_id: int, now: datetime):
+    """Unclaimed, lease expired, or already held by this admin"""
+    return or_(Skill.claimed_by.is_(None), Skill.claim_expires_at < now, Skill.claimed_by == admin_id)
+
+
+def queue_page(db: Session, admin_id: int, limit: int, after: Optional[Sequence] = None,
+               include_claimed: bool = False) -> List[tuple]:
+    """Up to `limit + 1` pending (skill, owner) rows following the `after` sort key"""
+    query = db.query(Skill, User).join(User, User.id == Skill.user_id).filter(Skill.status == SkillStatus.pending)
+    if not include_claimed:
+        query = query.filter(_claimable(admin_id, datetime.utcnow()))
+    if after:
+        query = query.filter(tuple_(*QUEUE_ORDER) > tuple_(*after))
+    return query.order_by(*QUEUE_ORDER).limit(limit + 1).all()
+
+
+def claim_skills(db: Session, admin_id: int, limit: int) -> List[tuple]:
+    """Lease the next `limit` claimable skills to an admin, renewing any they already hold.
+
+    The claim is one UPDATE whose WHERE clause re-checks the claim, so two
+    admins claiming at once never get the same skill; on Postgres the
+    candidate rows are locked with SKIP LOCKED so they don't wait on each other.
+    """
+    now = datetime.utcnow()
+    candidates = select(Skill.id).where(
+        Skill.status == SkillStatus.pending, _claimable(admin_id, now)
+    ).order_by(*QUEUE_ORDER).limit(limit).with_for_update(skip_locked=True)
+    claimed = db.execute(
+        update(Skill)
+        .where(Skill.id.in_(candidates), Skill.status == SkillStatus.pending, _claimable(admin_id, now))
+        .values(claimed_by=admin_id, claim_expires_at=now + timedelta(seconds=settings.MODERATION_LEASE_SECONDS))
+        .returning(Skill.id)
+    ).scalars().all()
+    db.commit()
+    if not claimed:
+        return []
+    return db.query(Skill, User).join(User, User.id == Skill.user_id) \
+        .filter(Skill.id.in_(claimed)).order_by(*QUEUE_ORDER).all()
+
+
+def release_claims(db: Session, admin_id: int, skill_ids: Optional[List[int]] = None) -> int:
+    """Give back an admin's claims, all of them unless `skill_ids` is given"""
+    stmt = update(Skill).where(Skill.claimed_by == admin_id)
+    if skill_ids is not None:
+        stmt = stmt.where(Skill.id.in_(skill_ids))
+    released = db.execute(stmt.values(claimed_by=None, claim_expires_at=None)).rowcount
+    db.commit()
+    return released
@@ -0,0 +1,174 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from sqlalchemy import text
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bounded so one stalled client can't grow memory without limit
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class LocalBackend:
+    """Delivers events only to subscribers connected to this process"""
+
+    def __init__(self):
+        self._deliver: Optional[Callable[[str], None]] = None
+
+    async def start(self, deliver: Callable[[str], None]):
+        self._deliver = deliver
+
+    def publish(self, message: str):
+        if self._deliver:
+            self._deliver(message)
+
+    async def stop(self):
+        self._deliver = None
+
+
+class PostgresNotifyBackend:
+    """Fans events out to every worker process through Postgres LISTEN/NOTIFY.
+
+    Publishing runs `pg_notify`; each worker holds one dedicated listening
+    connection outside the pool and delivers what it receives locally.
+    """
+
+    def __init__(self, engine, channel: str):
+        self.engine = engine
+        self.channel = channel
+        self._deliver: Optional[Callable[[str], None]] = None
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    async def start(self, deliver: Callable[[str], None]):
+        self._deliver = deliver
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._listen, name="pg-notify-listener", daemon=True)
+        self._thread.start()
+
+    def publish(self, message: str):
+        with self.engine.connect() as conn:
+            conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": self.channel, "payload": message})
+            conn.commit()
+
+    async def stop(self):
+        self._stopping.set()
+        if self._thread:
+            await asyncio.to_thread(self._thread.join, 5)
+
+    def _listen(self):
+        while not self._stopping.is_set():
+            try:
+                raw = self.engine.raw_connection()
+                raw.detach()
+                conn = raw.driver_connection
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+                try:
+                    while not self._stopping.is_set():
+                        if select.select([conn], [], [], 1.0) == ([], [], []):
+                            continue
+                        conn.poll()
+                        while conn.notifies:
+                            self._deliver(conn.notifies.pop(0).payload)
+                finally:
+                    conn.close()
+            except Exception:
+                logger.exception("Notification listener lost its connection, reconnecting")
+                self._stopping.wait(5)
+
+
+class NotificationHub:
+    """In-process pub/sub for pushing swap and platform events to connected users.
+
+    `publish` is safe to call from the sync endpoints running in the threadpool;
+    delivery to subscriber queues always happens on the event loop. Listeners
+    added with `add_listener` see every event of a type that reaches this
+    process, whichever worker published it.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self._listeners: Dict[str, List[Callable[[dict], None]]] = defaultdict(list)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._backend = None
+
+    async def start(self, backend):
+        self._loop = asyncio.get_running_loop()
+        self._backend = backend
+        await backend.start(self._deliver_threadsafe)
+
+    async def stop(self):
+        if self._backend:
+            await self._backend.stop()
+        self._backend = None
+        self._loop = None
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers[user_id].add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue):
+        queues = self._subscribers.get(user_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[user_id]
+
+    def add_listener(self, event_type: str, callback: Callable[[dict], None]):
+        self._listeners[event_type].append(callback)
+
+    def publish(self, event_type: str, data: dict, user_ids: Optional[Iterable[int]] = None):
+        """Send an event to the given users, or to everyone when `user_ids` is None"""
+        if self._backend is None:
+            return
+        message = json.dumps({
+            "type": event_type,
+            "data": data,
+            "user_ids": sorted(set(user_ids)) if user_ids is not None else None,
+        }, default=str)
+        try:
+            self._backend.publish(message)
+        except Exception:
+            logger.exception("Failed to publish %s event", event_type)
+
+    def _deliver_threadsafe(self, message: str):
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._dispatch, message)
+
+    def _dispatch(self, message: str):
+        event = json.loads(message)
+        for callback in self._listeners.get(event["type"], ()):
+            try:
+                callback(event["data"])
+            except Exception:
+                logger.exception("Listener for %s events failed", event["type"])
+        # Format the SSE frame once and share it between subscribers
+        frame = f"event: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+        if event["user_ids"] is None:
+            targets = [q for queues in self._subscribers.values() for q in queues]
+        else:
+            targets = [q for user_id in event["user_ids"] for q in self._subscribers.get(user_id, ())]
+        for queue in targets:
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                logger.warning("Dropping %s event for a slow subscriber", event["type"])
+
+
+def build_backend():
+    if settings.NOTIFICATIONS_BACKEND == "postgres":
+        from app.db.session import engine
+        return PostgresNotifyBackend(engine, settings.NOTIFICATIONS_CHANNEL)
+    return LocalBackend()
+
+
+hub = NotificationHub()
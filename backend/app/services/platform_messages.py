@@ -0,0 +1,53 @@
+import hashlib
+import json
+from typing import NamedTuple
+from app.core.cache import SnapshotCache
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models import PlatformMessage
+from app.services.notifications import hub
+
+CHANGE_EVENTS = ("platform_message", "platform_message_deleted")
+
+
+class ActiveMessages(NamedTuple):
+    etag: str
+    body: bytes  # serialized once and shared by every poll
+
+
+def load_active_messages() -> ActiveMessages:
+    db = SessionLocal()
+    try:
+        messages = db.query(PlatformMessage).filter(PlatformMessage.is_active == True) \
+            .order_by(PlatformMessage.created_at.desc(), PlatformMessage.id.desc()).all()
+        items = [
+            {
+                "id": m.id,
+                "title": m.title,
+                "message": m.message,
+                "message_type": m.message_type,
+                "created_at": m.created_at.isoformat() if m.created_at else None,
+            }
+            for m in messages
+        ]
+    finally:
+        db.close()
+    body = json.dumps(items, separators=(",", ":")).encode()
+    # Derived from the content, so every worker hands out the same tag for the same list
+    return ActiveMessages(etag=f'"{hashlib.sha1(body).hexdigest()}"', body=body)
+
+
+active_messages_cache = SnapshotCache(settings.PLATFORM_MESSAGES_CACHE_TTL_SECONDS, name="active_messages")
+
+
+def get_active_messages() -> ActiveMessages:
+    return active_messages_cache.get(load_active_messages)
+
+
+def invalidate_active_messages(_data: dict = None):
+    active_messages_cache.invalidate()
+
+
+# Changes published by other workers reach this process through the hub
+for event_type in CHANGE_EVENTS:
+    hub.add_listener(event_type, invalidate_active_messages)
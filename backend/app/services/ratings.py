@@ -0,0 +1,64 @@
+from sqlalchemy import func, case
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.rating import Rating
+from app.models.user_rating import UserRating
+
+
+def bayesian_average(rating_sum, rating_count):
+    """Shrunk average; works on plain numbers and on SQL column expressions"""
+    prior_weight = settings.RATING_PRIOR_WEIGHT
+    return (prior_weight * settings.RATING_PRIOR_MEAN + rating_sum) / (prior_weight + rating_count)
+
+
+def record_rating(db: Session, user_id: int, stars: int):
+    """Add one rating to the user's running aggregates without committing.
+
+    Uses an atomic in-place UPDATE so concurrent ratings never lose increments;
+    the row is created on first use.
+    """
+    histogram_column = getattr(UserRating, f"stars_{stars}")
+    updated = db.query(UserRating).filter(UserRating.user_id == user_id).update({
+        UserRating.rating_count: UserRating.rating_count + 1,
+        UserRating.rating_sum: UserRating.rating_sum + stars,
+        histogram_column: histogram_column + 1,
+        UserRating.bayesian_average: bayesian_average(UserRating.rating_sum + stars, UserRating.rating_count + 1),
+    }, synchronize_session=False)
+    if updated:
+        return
+
+    try:
+        with db.begin_nested():
+            db.add(UserRating(
+                user_id=user_id,
+                rating_count=1,
+                rating_sum=stars,
+                **{f"stars_{n}": int(n == stars) for n in range(1, 6)},
+                bayesian_average=bayesian_average(stars, 1),
+            ))
+    except IntegrityError:
+        # Another request created the row first
+        record_rating(db, user_id, stars)
+
+
+def rebuild_rating_stats(db: Session) -> int:
+    """Recompute every user's aggregates from the ratings table and commit"""
+    rows = db.query(
+        Rating.to_user_id,
+        func.count(Rating.id),
+        func.sum(Rating.stars),
+        *[func.sum(case((Rating.stars == n, 1), else_=0)) for n in range(1, 6)]
+    ).filter(Rating.to_user_id.isnot(None)).group_by(Rating.to_user_id).all()
+
+    db.query(UserRating).delete(synchronize_session=False)
+    for user_id, count, total, *histogram in rows:
+        db.add(UserRating(
+            user_id=user_id,
+            rating_count=count,
+            rating_sum=total,
+            **{f"stars_{n}": histogram[n - 1] for n in range(1, 6)},
+            bayesian_average=bayesian_average(total, count),
+        ))
+    db.commit()
+    return len(rows)
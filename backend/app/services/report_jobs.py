@@ -0,0 +1,296 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Optional
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models import ReportJob
+from app.schemas.admin import ReportRequest, ReportJobResponse
+from app.services.reports import count_report_rows, resolve_report_range, stream_report
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "running")
+
+# Heartbeats an active job may miss before its worker is assumed gone
+MISSED_HEARTBEATS = 3
+
+_executor = ThreadPoolExecutor(max_workers=settings.REPORT_JOB_WORKERS, thread_name_prefix="report-job")
+# Jobs queued or running in this process. Everything other workers need to
+# see (status, progress, liveness) is kept on the job's row.
+_cancel_events: Dict[str, threading.Event] = {}
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def params_hash(request: ReportRequest) -> str:
+    params = {
+        "report_type": request.report_type,
+        "format": request.format,
+        "gzip": request.gzip,
+        "start_date": request.start_date,
+        "end_date": request.end_date,
+    }
+    return hashlib.sha256(json.dumps(params, default=str, sort_keys=True).encode()).hexdigest()
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def job_response(job: ReportJob) -> ReportJobResponse:
+    rows_written = job.rows_written or 0
+    progress = None
+    if job.status == "completed":
+        progress = 1.0
+    elif job.rows_total:
+        progress = min(rows_written / job.rows_total, 1.0)
+    return ReportJobResponse(
+        id=job.id,
+        report_type=job.report_type,
+        format=job.format,
+        gzip=bool(job.gzip),
+        status=job.status,
+        rows_total=job.rows_total,
+        rows_written=rows_written,
+        progress=progress,
+        error=job.error,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+        download_url=f"{settings.API_V1_STR}/admin/reports/jobs/{job.id}/download" if job.status == "completed" else None
+    )
+
+
+def find_reusable_job(db: Session, digest: str) -> Optional[ReportJob]:
+    """An identical job that is still running, or finished recently enough to serve from disk.
+
+    Active jobs whose worker went away are failed by the heartbeat check, so
+    an active job found here is still being worked on.
+    """
+    candidates = db.query(ReportJob).filter(
+        ReportJob.params_hash == digest,
+        ReportJob.status.in_(ACTIVE_STATUSES + ("completed",))
+    ).order_by(ReportJob.created_at.desc()).all()
+    now = _now()
+    for job in candidates:
+        if job.status in ACTIVE_STATUSES:
+            return job
+        elif job.file_path and os.path.exists(job.file_path) and \
+                now - _as_utc(job.finished_at) < timedelta(seconds=settings.REPORT_JOB_RESULT_TTL_SECONDS):
+            return job
+    return None
+
+
+def purge_expired_jobs(db: Session):
+    """Delete result files past their TTL"""
+    cutoff = _now() - timedelta(seconds=settings.REPORT_JOB_RESULT_TTL_SECONDS)
+    expired = db.query(ReportJob).filter(ReportJob.status == "completed", ReportJob.finished_at < cutoff).all()
+    for job in expired:
+        if job.file_path:
+            Path(job.file_path).unlink(missing_ok=True)
+        job.status = "expired"
+        job.file_path = None
+    if expired:
+        db.commit()
+
+
+def enqueue_report_job(db: Session, request: ReportRequest, admin_id: int) -> ReportJob:
+    """Return an existing identical job if there is one, otherwise queue a new job"""
+    purge_expired_jobs(db)
+    digest = params_hash(request)
+    existing = find_reusable_job(db, digest)
+    if existing:
+        return existing
+
+    job = ReportJob(
+        id=uuid.uuid4().hex,
+        params_hash=digest,
+        report_type=request.report_type,
+        format=request.format,
+        gzip=request.gzip,
+        start_date=request.start_date,
+        end_date=request.end_date,
+        status="queued",
+        created_by=admin_id,
+        heartbeat_at=_now()
+    )
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        # An identical request queued its job first; the partial unique index
+        # on params_hash allows one active job per set of parameters
+        db.rollback()
+        existing = db.query(ReportJob).filter(
+            ReportJob.params_hash == digest, ReportJob.status.in_(ACTIVE_STATUSES)
+        ).first()
+        if existing is None:
+            raise
+        return existing
+    db.refresh(job)
+
+    _cancel_events[job.id] = threading.Event()
+    _executor.submit(_run_job, job.id)
+    return job
+
+
+def cancel_report_job(db: Session, job: ReportJob) -> ReportJob:
+    """Mark the job cancelled. A job running in another worker stops at its next progress write."""
+    if job.status in ACTIVE_STATUSES:
+        event = _cancel_events.get(job.id)
+        if event:
+            event.set()
+        job.status = "cancelled"
+        job.finished_at = _now()
+        db.commit()
+    return job
+
+
+def _update_running(job_id: str, **values) -> bool:
+    """Update the job if it is still running; False once it was cancelled or failed elsewhere"""
+    db = SessionLocal()
+    try:
+        updated = db.query(ReportJob).filter(
+            ReportJob.id == job_id, ReportJob.status == "running"
+        ).update(values, synchronize_session=False)
+        db.commit()
+        return bool(updated)
+    finally:
+        db.close()
+
+
+def _run_job(job_id: str):
+    cancel_event = _cancel_events.get(job_id) or threading.Event()
+    db = SessionLocal()
+    try:
+        job = db.query(ReportJob).filter(ReportJob.id == job_id).first()
+        if job is None or job.status != "queued" or cancel_event.is_set():
+            return
+        report_type, report_format, gzip = job.report_type, job.format, job.gzip
+        start_date, end_date = resolve_report_range(job.start_date, job.end_date)
+        # Conditional, so a cancellation made through another worker is not overwritten
+        started = db.query(ReportJob).filter(ReportJob.id == job_id, ReportJob.status == "queued").update(
+            {"status": "running", "heartbeat_at": _now()}, synchronize_session=False
+        )
+        db.commit()
+        if not started:
+            return
+        rows_total = count_report_rows(db, report_type, start_date, end_date)
+    finally:
+        db.close()
+    if not _update_running(job_id, rows_total=rows_total):
+        return
+
+    directory = Path(settings.REPORT_JOB_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    final_path = directory / f"{job_id}.{report_format}{'.gz' if gzip else ''}"
+    partial_path = final_path.with_name(final_path.name + ".part")
+    rows_written = 0
+    batches = 0
+
+    def on_batch(rows: int):
+        nonlocal rows_written, batches
+        rows_written += rows
+        batches += 1
+        if cancel_event.is_set():
+            raise JobCancelled()
+        if batches % settings.REPORT_JOB_PROGRESS_BATCHES == 0 and \
+                not _update_running(job_id, rows_written=rows_written, heartbeat_at=_now()):
+            raise JobCancelled()
+
+    try:
+        with open(partial_path, "wb") as output:
+            for chunk in stream_report(report_type, report_format, start_date, end_date, gzip=gzip, on_batch=on_batch):
+                output.write(chunk)
+        os.replace(partial_path, final_path)
+        if not _update_running(job_id, status="completed", rows_written=rows_written,
+                               file_path=str(final_path), finished_at=_now()):
+            # Cancelled after the last progress write
+            final_path.unlink(missing_ok=True)
+    except JobCancelled:
+        partial_path.unlink(missing_ok=True)
+    except Exception as e:
+        logger.exception("Report job %s failed", job_id)
+        partial_path.unlink(missing_ok=True)
+        _update_running(job_id, status="failed", error=str(e), rows_written=rows_written, finished_at=_now())
+    finally:
+        _cancel_events.pop(job_id, None)
+
+
+def check_job_heartbeats(db: Session) -> int:
+    """Heartbeat this process's jobs and fail active jobs whose worker stopped.
+
+    Also stops local jobs that were cancelled through another worker before
+    they reached their next progress write. Returns the number of jobs failed.
+    """
+    now = _now()
+    local = list(_cancel_events)
+    if local:
+        db.query(ReportJob).filter(ReportJob.id.in_(local), ReportJob.status.in_(ACTIVE_STATUSES)).update(
+            {"heartbeat_at": now}, synchronize_session=False
+        )
+        for (job_id,) in db.query(ReportJob.id).filter(
+            ReportJob.id.in_(local), ReportJob.status.notin_(ACTIVE_STATUSES)
+        ).all():
+            event = _cancel_events.get(job_id)
+            if event:
+                event.set()
+        db.commit()
+
+    cutoff = now - timedelta(seconds=settings.REPORT_JOB_HEARTBEAT_SECONDS * MISSED_HEARTBEATS)
+    stale = ReportJob.status.in_(ACTIVE_STATUSES), func.coalesce(ReportJob.heartbeat_at, ReportJob.created_at) < cutoff
+    orphaned = [job_id for (job_id,) in db.query(ReportJob.id).filter(*stale).all()]
+    if not orphaned:
+        return 0
+    failed = db.query(ReportJob).filter(ReportJob.id.in_(orphaned), *stale).update(
+        {"status": "failed", "error": "The worker running this job stopped", "finished_at": now},
+        synchronize_session=False
+    )
+    db.commit()
+    logger.warning("Marked %d report job(s) failed after their worker stopped", failed)
+    for job_id in orphaned:
+        for partial in Path(settings.REPORT_JOB_DIR).glob(f"{job_id}.*.part"):
+            partial.unlink(missing_ok=True)
+    return failed
+
+
+async def run_report_job_monitor(stop_event: asyncio.Event):
+    """Check job heartbeats every REPORT_JOB_HEARTBEAT_SECONDS until `stop_event` is set.
+
+    The first check runs at startup, so jobs left behind by a restart are
+    failed as soon as they have missed enough heartbeats.
+    """
+    def check_once():
+        db = SessionLocal()
+        try:
+            check_job_heartbeats(db)
+        finally:
+            db.close()
+
+    while not stop_event.is_set():
+        try:
+            await asyncio.to_thread(check_once)
+        except Exception:
+            logger.exception("Report job heartbeat check failed")
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=settings.REPORT_JOB_HEARTBEAT_SECONDS)
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,326 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Iterator, List, NamedTuple, Optional
+from sqlalchemy import select, func, Boolean, DateTime, Enum, Float, Integer
+from sqlalchemy.orm import Session, aliased
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models import User, Skill, Swap, Rating
+from app.services.admin_loader import AdminLoader
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # columnar exports are optional
+    pa = pq = None
+
+
+class ReportSpec(NamedTuple):
+    model: Any
+    csv_header: List[str]
+    csv_row: Callable[[Any, AdminLoader], list]
+    json_row: Callable[[Any], dict]
+    preload: Optional[Callable[[AdminLoader, list], None]] = None
+    # Plain column select for the columnar formats, with names joined in SQL
+    columns: Optional[Callable[[], Any]] = None
+
+
+def _swap_columns():
+    sender, receiver = aliased(User), aliased(User)
+    return select(
+        Swap.id, Swap.from_user_id, sender.name.label("from_user"), Swap.to_user_id,
+        receiver.name.label("to_user"), Swap.skill_offered_id, Swap.skill_requested_id,
+        Swap.status, Swap.created_at, Swap.updated_at
+    ).outerjoin(sender, sender.id == Swap.from_user_id).outerjoin(receiver, receiver.id == Swap.to_user_id)
+
+
+def _rating_columns():
+    rater, ratee = aliased(User), aliased(User)
+    return select(
+        Rating.id, Rating.swap_id, Rating.from_user_id, rater.name.label("from_user"), Rating.to_user_id,
+        ratee.name.label("to_user"), Rating.stars, Rating.feedback, Rating.created_at
+    ).outerjoin(rater, rater.id == Rating.from_user_id).outerjoin(ratee, ratee.id == Rating.to_user_id)
+
+
+REPORTS = {
+    "users": ReportSpec(
+        model=User,
+        csv_header=["ID", "Name", "Email", "Location", "Is Admin", "Is Banned", "Created At"],
+        csv_row=lambda u, loader: [u.id, u.name, u.email, u.location, u.is_admin, u.is_banned, u.created_at],
+        json_row=lambda u: {"id": u.id, "name": u.name, "email": u.email, "created_at": u.created_at},
+        columns=lambda: select(
+            User.id, User.name, User.email, User.location, User.is_admin, User.is_banned, User.is_public,
+            User.created_at, User.last_login
+        ),
+    ),
+    "swaps": ReportSpec(
+        model=Swap,
+        csv_header=["ID", "From User", "To User", "Status", "Created At"],
+        csv_row=lambda s, loader: [
+            s.id, loader.user_name(s.from_user_id), loader.user_name(s.to_user_id), s.status, s.created_at
+        ],
+        json_row=lambda s: {"id": s.id, "status": s.status, "created_at": s.created_at},
+        preload=AdminLoader.load_for_swaps,
+        columns=_swap_columns,
+    ),
+    "skills": ReportSpec(
+        model=Skill,
+        csv_header=["ID", "Name", "Type", "Level", "User", "Status", "Created At"],
+        csv_row=lambda s, loader: [
+            s.id, s.name, s.type.value, s.level.value, loader.user_name(s.user_id), s.status.value, s.created_at
+        ],
+        json_row=lambda s: {"id": s.id, "name": s.name, "type": s.type.value, "status": s.status.value},
+        preload=AdminLoader.load_for_skills,
+        columns=lambda: select(
+            Skill.id, Skill.name, Skill.type, Skill.level, Skill.user_id, User.name.label("user"),
+            Skill.status, Skill.created_at
+        ).outerjoin(User, User.id == Skill.user_id),
+    ),
+    "ratings": ReportSpec(
+        model=Rating,
+        csv_header=["ID", "From User", "To User", "Stars", "Feedback", "Created At"],
+        csv_row=lambda r, loader: [
+            r.id, loader.user_name(r.from_user_id), loader.user_name(r.to_user_id), r.stars, r.feedback, r.created_at
+        ],
+        json_row=lambda r: {"id": r.id, "stars": r.stars, "feedback": r.feedback, "created_at": r.created_at},
+        preload=AdminLoader.load_for_ratings,
+        columns=_rating_columns,
+    ),
+}
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+COLUMNAR_FORMATS = {"parquet", "arrow"}
+# Rows per Parquet row group; larger groups compress and scan better
+PARQUET_ROW_GROUP_SIZE = 64 * 1024
+
+
+def resolve_report_range(start_date: Optional[datetime], end_date: Optional[datetime]):
+    """Default to the last 30 days"""
+    return start_date or datetime.now() - timedelta(days=30), end_date or datetime.now()
+
+
+def report_filename(report_type: str, report_format: str, gzip: bool = False) -> str:
+    filename = f"{report_type}_report_{datetime.now().strftime('%Y%m%d')}.{report_format}"
+    return filename + ".gz" if gzip else filename
+
+
+def _report_filter(model, start_date: datetime, end_date: datetime):
+    return model.created_at >= start_date, model.created_at <= end_date
+
+
+def count_report_rows(db: Session, report_type: str, start_date: datetime, end_date: datetime) -> int:
+    model = REPORTS[report_type].model
+    return db.query(func.count(model.id)).filter(*_report_filter(model, start_date, end_date)).scalar()
+
+
+def iter_report_batches(db: Session, report_type: str, start_date: datetime, end_date: datetime,
+                        on_batch: Optional[Callable[[int], None]] = None):
+    """Yield (rows, loader) batches read through a server-side cursor.
+
+    Only REPORT_BATCH_SIZE rows are held at a time; display names for each
+    batch are resolved with a couple of batched IN queries. `on_batch` is
+    called with each batch size after it has been written out.
+    """
+    spec = REPORTS[report_type]
+    model = spec.model
+    stmt = select(model).where(
+        *_report_filter(model, start_date, end_date)
+    ).order_by(model.id).execution_options(yield_per=settings.REPORT_BATCH_SIZE)
+
+    for rows in db.scalars(stmt).partitions():
+        # A loader per batch: one kept for the whole report would cache every user and skill it names
+        loader = AdminLoader(db)
+        if spec.preload:
+            spec.preload(loader, rows)
+        yield rows, loader
+        if on_batch:
+            on_batch(len(rows))
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def csv_chunks(db: Session, report_type: str, start_date: datetime, end_date: datetime,
+               on_batch: Optional[Callable[[int], None]] = None) -> Iterator[str]:
+    spec = REPORTS[report_type]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(spec.csv_header)
+    yield buffer.getvalue()
+    for rows, loader in iter_report_batches(db, report_type, start_date, end_date, on_batch):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(spec.csv_row(row, loader) for row in rows)
+        yield buffer.getvalue()
+
+
+def ndjson_chunks(db: Session, report_type: str, start_date: datetime, end_date: datetime,
+                  on_batch: Optional[Callable[[int], None]] = None) -> Iterator[str]:
+    spec = REPORTS[report_type]
+    for rows, _ in iter_report_batches(db, report_type, start_date, end_date, on_batch):
+        yield "".join(json.dumps(spec.json_row(row), default=_json_default) + "\n" for row in rows)
+
+
+def json_chunks(db: Session, report_type: str, start_date: datetime, end_date: datetime,
+                on_batch: Optional[Callable[[int], None]] = None) -> Iterator[str]:
+    """A JSON array streamed batch by batch"""
+    spec = REPORTS[report_type]
+    yield "["
+    separator = ""
+    for rows, _ in iter_report_batches(db, report_type, start_date, end_date, on_batch):
+        yield separator + ",".join(json.dumps(spec.json_row(row), default=_json_default) for row in rows)
+        separator = ","
+    yield "]"
+
+
+def _arrow_type(column):
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us", tz="UTC" if column.type.timezone else None)
+    if isinstance(column.type, Enum):
+        return pa.dictionary(pa.int8(), pa.string())
+    return pa.string()
+
+
+def _enum_values(values):
+    return [value.value if value is not None else None for value in values]
+
+
+def report_record_batches(db: Session, report_type: str, start_date: datetime, end_date: datetime,
+                          on_batch: Optional[Callable[[int], None]] = None):
+    """Return the Arrow schema and an iterator of record batches.
+
+    Batches are built column by column from plain row tuples, without
+    loading ORM objects or building a dict per row.
+    """
+    spec = REPORTS[report_type]
+    stmt = spec.columns().where(
+        *_report_filter(spec.model, start_date, end_date)
+    ).order_by(spec.model.id).execution_options(yield_per=settings.REPORT_BATCH_SIZE)
+    columns = list(stmt.selected_columns)
+    schema = pa.schema([pa.field(column.name, _arrow_type(column)) for column in columns])
+    enum_columns = {i for i, column in enumerate(columns) if isinstance(column.type, Enum)}
+
+    def batches():
+        for rows in db.execute(stmt).partitions():
+            arrays = []
+            for i, values in enumerate(zip(*rows)):
+                if i in enum_columns:
+                    values = _enum_values(values)
+                arrays.append(pa.array(values, type=schema.field(i).type))
+            yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+            if on_batch:
+                on_batch(len(rows))
+
+    return schema, batches()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose contents are drained after each write"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def parquet_chunks(db: Session, report_type: str, start_date: datetime, end_date: datetime,
+                   on_batch: Optional[Callable[[int], None]] = None) -> Iterator[bytes]:
+    schema, batches = report_record_batches(db, report_type, start_date, end_date, on_batch)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    pending, pending_rows = [], 0
+    for batch in batches:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        if pending_rows >= PARQUET_ROW_GROUP_SIZE:
+            writer.write_table(pa.Table.from_batches(pending, schema), row_group_size=PARQUET_ROW_GROUP_SIZE)
+            pending, pending_rows = [], 0
+            yield sink.drain()
+    if pending:
+        writer.write_table(pa.Table.from_batches(pending, schema), row_group_size=PARQUET_ROW_GROUP_SIZE)
+    writer.close()
+    yield sink.drain()
+
+
+def arrow_chunks(db: Session, report_type: str, start_date: datetime, end_date: datetime,
+                 on_batch: Optional[Callable[[int], None]] = None) -> Iterator[bytes]:
+    """Arrow IPC stream format, one record batch per read batch"""
+    schema, batches = report_record_batches(db, report_type, start_date, end_date, on_batch)
+    sink = _ChunkSink()
+    writer = pa.ipc.new_stream(sink, schema, options=pa.ipc.IpcWriteOptions(compression="zstd"))
+    yield sink.drain()
+    for batch in batches:
+        writer.write_batch(batch)
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+WRITERS = {
+    "csv": csv_chunks,
+    "ndjson": ndjson_chunks,
+    "json": json_chunks,
+    "parquet": parquet_chunks,
+    "arrow": arrow_chunks,
+}
+
+
+def format_unavailable(report_format: str) -> bool:
+    return report_format in COLUMNAR_FORMATS and pa is None
+
+
+def gzip_chunks(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=31)  # gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_report(report_type: str, report_format: str, start_date: datetime, end_date: datetime,
+                  gzip: bool = False, on_batch: Optional[Callable[[int], None]] = None) -> Iterator[bytes]:
+    """Stream an encoded report using its own session, so it can outlive the request handler"""
+    db = SessionLocal()
+    try:
+        chunks = WRITERS[report_format](db, report_type, start_date, end_date, on_batch)
+        if report_format not in COLUMNAR_FORMATS:
+            chunks = (chunk.encode() for chunk in chunks)
+        yield from gzip_chunks(chunks) if gzip else chunks
+    finally:
+        db.close()
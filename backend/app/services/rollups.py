@@ -0,0 +1,160 @@
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models import User, Skill, Swap, SwapStatus, Rating, DailyRollup, RollupWatermark
+from app.models.swap import status_timestamp
+
+logger = logging.getLogger(__name__)
+
+WATERMARK = "daily"
+
+# Swaps are counted on the day they entered each status, from that status's own timestamp column,
+# so later transitions don't move or drop earlier ones
+SWAP_TRANSITIONS = [s for s in SwapStatus if s != SwapStatus.pending]
+
+STORED_METRICS = [
+    "users_registered", "skills_created", "swaps_created",
+    *(f"swaps_{s.value}" for s in SWAP_TRANSITIONS),
+    "ratings_count", "ratings_stars",
+]
+# Derived from stored metrics when a series is read
+DERIVED_METRICS = {"ratings_average": ("ratings_stars", "ratings_count")}
+METRICS = STORED_METRICS + list(DERIVED_METRICS)
+
+GRANULARITIES = {
+    "day": lambda d: d,
+    "week": lambda d: d - timedelta(days=d.weekday()),
+    "month": lambda d: d.replace(day=1),
+}
+
+
+def _as_date(value) -> date:
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def aggregate_days(db: Session, start: date, end: date) -> Dict[Tuple[str, date], int]:
+    """Totals per (metric, day) for the days start..end inclusive, one grouped query per timestamp column"""
+    lower = datetime.combine(start, time.min)
+    upper = datetime.combine(end + timedelta(days=1), time.min)
+    totals: Dict[Tuple[str, date], int] = defaultdict(int)
+
+    def daily(column, *values):
+        day = func.date(column)
+        return db.query(day, *values).filter(column >= lower, column < upper).group_by(day)
+
+    for day, count in daily(User.created_at, func.count(User.id)):
+        totals[("users_registered", _as_date(day))] += count
+    for day, count in daily(Skill.created_at, func.count(Skill.id)):
+        totals[("skills_created", _as_date(day))] += count
+    for day, count in daily(Swap.created_at, func.count(Swap.id)):
+        totals[("swaps_created", _as_date(day))] += count
+    for swap_status in SWAP_TRANSITIONS:
+        for day, count in daily(getattr(Swap, status_timestamp(swap_status)), func.count(Swap.id)):
+            totals[(f"swaps_{swap_status.value}", _as_date(day))] += count
+    for day, count, stars in daily(Rating.created_at, func.count(Rating.id), func.sum(Rating.stars)):
+        totals[("ratings_count", _as_date(day))] += count
+        totals[("ratings_stars", _as_date(day))] += stars or 0
+
+    return {key: value for key, value in totals.items() if start <= key[1] <= end and value}
+
+
+def _first_activity_day(db: Session) -> Optional[date]:
+    days = [
+        db.query(func.min(column)).scalar()
+        for column in (User.created_at, Skill.created_at, Swap.created_at, Rating.created_at)
+    ]
+    days = [_as_date(d) for d in days if d is not None]
+    return min(days) if days else None
+
+
+def run_rollups(db: Session, today: Optional[date] = None) -> int:
+    """Aggregate every complete day after the watermark, returning the number of days processed"""
+    end = (today or datetime.utcnow().date()) - timedelta(days=1)
+    watermark = db.query(RollupWatermark).filter(RollupWatermark.name == WATERMARK).first()
+    if watermark:
+        start = watermark.last_day + timedelta(days=1)
+    else:
+        start = _first_activity_day(db) or end
+    if start > end:
+        return 0
+
+    totals = aggregate_days(db, start, end)
+    # Replace rather than add, so a rerun over the same days is harmless
+    db.query(DailyRollup).filter(DailyRollup.day >= start, DailyRollup.day <= end).delete(synchronize_session=False)
+    if totals:
+        db.execute(insert(DailyRollup), [
+            {"metric": metric, "day": day, "value": value} for (metric, day), value in totals.items()
+        ])
+    if watermark:
+        watermark.last_day = end
+    else:
+        db.add(RollupWatermark(name=WATERMARK, last_day=end))
+    db.commit()
+    return (end - start).days + 1
+
+
+def complete_through(db: Session) -> Optional[date]:
+    return db.query(RollupWatermark.last_day).filter(RollupWatermark.name == WATERMARK).scalar()
+
+
+def read_timeseries(db: Session, metrics: List[str], granularity: str, start: date, end: date) -> Dict[str, list]:
+    """Bucket daily rollups by day, week or month; periods without activity are reported as zero"""
+    bucket = GRANULARITIES[granularity]
+    stored = {m for metric in metrics for m in DERIVED_METRICS.get(metric, (metric,))}
+    sums: Dict[str, Dict[date, int]] = defaultdict(lambda: defaultdict(int))
+    rows = db.query(DailyRollup.metric, DailyRollup.day, DailyRollup.value).filter(
+        DailyRollup.metric.in_(stored), DailyRollup.day >= start, DailyRollup.day <= end
+    )
+    for metric, day, value in rows:
+        sums[metric][bucket(day)] += value
+
+    periods = []
+    day = start
+    while day <= end:
+        period = bucket(day)
+        if not periods or periods[-1] != period:
+            periods.append(period)
+        day += timedelta(days=1)
+
+    series = {}
+    for metric in metrics:
+        if metric in DERIVED_METRICS:
+            numerator, denominator = (sums[m] for m in DERIVED_METRICS[metric])
+            series[metric] = [
+                (p, round(numerator[p] / denominator[p], 2) if denominator[p] else None) for p in periods
+            ]
+        else:
+            series[metric] = [(p, sums[metric][p]) for p in periods]
+    return series
+
+
+async def run_rollup_job(stop_event: asyncio.Event):
+    """Roll up newly completed days every ROLLUPS_INTERVAL_SECONDS until `stop_event` is set"""
+    def rollup_once():
+        db = SessionLocal()
+        try:
+            days = run_rollups(db)
+            if days:
+                logger.info("Rolled up %d day(s) of activity", days)
+        finally:
+            db.close()
+
+    while not stop_event.is_set():
+        try:
+            await asyncio.to_thread(rollup_once)
+        except Exception:
+            logger.exception("Daily rollup failed")
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=settings.ROLLUPS_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.swap import Swap, SwapStatus, swap_status_values
+from app.services.counters import adjust_counters, swap_status_counter
+
+logger = logging.getLogger(__name__)
+
+# When a swap in each status became stale-able: accepted swaps count from their
+# acceptance (swaps accepted before accepted_at existed fall back to creation)
+STALE_SINCE = {
+    SwapStatus.pending: Swap.created_at,
+    SwapStatus.accepted: func.coalesce(Swap.accepted_at, Swap.created_at),
+}
+
+
+def expire_stale_swaps(db: Session, swap_status: SwapStatus, ttl: timedelta, batch_size: int) -> int:
+    """Expire one batch of swaps that have been in `swap_status` longer than `ttl`, returning the number expired.
+
+    The batch is selected by primary key in a subquery so the UPDATE stays short
+    and portable (SQLite does not support UPDATE ... LIMIT by default). Oldest
+    swaps go first, in the order of the sweeper's partial index on the status.
+    """
+    cutoff = datetime.now(timezone.utc) - ttl
+    since = STALE_SINCE[swap_status]
+    batch = (
+        select(Swap.id)
+        .where(Swap.status == swap_status, since < cutoff)
+        .order_by(since)
+        .limit(batch_size)
+        .scalar_subquery()
+    )
+    result = db.execute(
+        update(Swap)
+        .where(Swap.id.in_(batch), Swap.status == swap_status)
+        .values(**swap_status_values(SwapStatus.expired))
+        .execution_options(synchronize_session=False)
+    )
+    adjust_counters(db, {swap_status_counter(swap_status): -result.rowcount, "swaps_expired": result.rowcount})
+    db.commit()
+    return result.rowcount
+
+
+def sweep_once() -> bool:
+    """Run one sweeper tick. Returns True if any batch was full and more work is waiting."""
+    ttls = {
+        SwapStatus.pending: timedelta(hours=settings.SWAP_PENDING_TTL_HOURS),
+        SwapStatus.accepted: timedelta(hours=settings.SWAP_ACCEPTED_TTL_HOURS),
+    }
+    backlog = False
+    db = SessionLocal()
+    try:
+        for swap_status, ttl in ttls.items():
+            expired = expire_stale_swaps(db, swap_status, ttl, settings.SWAP_SWEEP_BATCH_SIZE)
+            if expired:
+                logger.info("Expired %d stale %s swaps", expired, swap_status.value)
+            backlog = backlog or expired >= settings.SWAP_SWEEP_BATCH_SIZE
+    finally:
+        db.close()
+    return backlog
+
+
+async def run_swap_sweeper(stop_event: asyncio.Event):
+    """Expire stale swaps every SWAP_SWEEP_INTERVAL_SECONDS until `stop_event` is set.
+
+    Each tick expires at most one batch per status; when a batch comes back full
+    the next tick starts immediately so a backlog drains without long transactions.
+    """
+    while not stop_event.is_set():
+        backlog = False
+        try:
+            backlog = await asyncio.to_thread(sweep_once)
+        except Exception:
+            logger.exception("Stale swap sweep failed")
+        if backlog:
+            continue
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=settings.SWAP_SWEEP_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
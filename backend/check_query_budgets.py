@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Script to check how many SQL statements the main endpoints run.
+
+Seeds a throwaway SQLite database, calls each endpoint in QUERY_BUDGETS and
+exits non-zero if any runs more statements than its budget. The seeded data
+has several rows per user, so a loop that queries once per row goes over.
+"""
+import sys
+import os
+import shutil
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+WORK_DIR = tempfile.mkdtemp(prefix="query_budgets_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(WORK_DIR, 'query_budgets.db')}"
+os.environ["DATABASE_REPLICA_URLS"] = ""
+# Background jobs would add their statements to the counts
+for job in ("SWAP_SWEEPER_ENABLED", "COUNTERS_RECONCILE_ENABLED", "ROLLUPS_ENABLED", "REPORT_JOB_MONITOR_ENABLED"):
+    os.environ[job] = "false"
+os.makedirs(os.path.join(WORK_DIR, "uploads"))
+os.chdir(WORK_DIR)
+
+from fastapi.testclient import TestClient
+from app.core.security import create_access_token, get_password_hash
+from app.db.init_db import init_db
+from app.db.query_stats import capture_queries
+from app.db.session import SessionLocal
+from app.main import app
+from app.models import User, Skill, Swap, SwapStatus, Rating, SwapCoin
+from app.models.skill import SkillType, SkillLevel
+from app.services.counters import reconcile_counters
+from app.services.ratings import rebuild_rating_stats
+
+# Maximum statements per request, authentication included
+QUERY_BUDGETS = {
+    "/api/v1/me": 1,
+    "/api/v1/me/stats": 4,
+    "/api/v1/public-users": 2,
+    "/api/v1/public-users?sort=rating": 2,
+    "/api/v1/skills": 2,
+    "/api/v1/swaps": 2,
+    "/api/v1/swaps/1/ratings": 3,
+    "/api/v1/coins": 2,
+    "/api/v1/admin/dashboard": 7,
+    "/api/v1/admin/users": 2,
+    "/api/v1/admin/skills": 2,
+    "/api/v1/admin/swaps": 4,
+    "/api/v1/admin/stats": 2,
+}
+USERS = 8
+
+def seed():
+    db = SessionLocal()
+    try:
+        password_hash = get_password_hash("Budget@1234")
+        users = [
+            User(name=f"User{chr(65 + i)}", email=f"user{i}@example.com", password_hash=password_hash,
+                 is_public=True, is_admin=i == 0)
+            for i in range(USERS)
+        ]
+        db.add_all(users)
+        db.flush()
+        skills = {}
+        for user in users:
+            skills[user.id] = [
+                Skill(user_id=user.id, name=f"Skill {user.id} {kind.value}", type=kind, level=SkillLevel.beginner)
+                for kind in (SkillType.offered, SkillType.wanted)
+            ]
+            db.add_all(skills[user.id])
+            db.add(SwapCoin(user_id=user.id, coins=10))
+        db.flush()
+        for i, user in enumerate(users[1:], start=1):
+            for other in users[1:]:
+                if other.id == user.id:
+                    continue
+                swap = Swap(from_user_id=user.id, to_user_id=other.id, skill_offered_id=skills[user.id][0].id,
+                            skill_requested_id=skills[other.id][0].id,
+                            status=SwapStatus.completed if i % 2 else SwapStatus.pending)
+                db.add(swap)
+                db.flush()
+                if swap.status == SwapStatus.completed:
+                    db.add(Rating(swap_id=swap.id, from_user_id=user.id, to_user_id=other.id, stars=4))
+        db.commit()
+        rebuild_rating_stats(db)
+        reconcile_counters(db)
+        return [user.email for user in users]
+    finally:
+        db.close()
+
+def check_query_budgets() -> int:
+    init_db()
+    emails = seed()
+    admin = {"Authorization": f"Bearer {create_access_token({'email': emails[0]})}"}
+    member = {"Authorization": f"Bearer {create_access_token({'email': emails[1]})}"}
+    over = []
+    with TestClient(app) as client:
+        for path, budget in QUERY_BUDGETS.items():
+            headers = admin if path.startswith("/api/v1/admin") else member
+            with capture_queries() as stats:
+                response = client.get(path, headers=headers)
+            ok = response.status_code == 200 and stats.count <= budget
+            print(f"{'✅' if ok else '❌'} {path}: {stats.count} queries (budget {budget}), status {response.status_code}")
+            if not ok:
+                over.append(path)
+                for shape, n in stats.shapes.most_common():
+                    print(f"    {n}x {shape[:160]}")
+    if over:
+        print(f"{len(over)} endpoint(s) over budget or failing: {', '.join(over)}")
+        return 1
+    print("All endpoints within their query budgets")
+    return 0
+
+if __name__ == "__main__":
+    try:
+        code = check_query_budgets()
+    finally:
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+    sys.exit(code)
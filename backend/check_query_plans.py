@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Script to check that the hot queries are served by indexes.
+
+Runs EXPLAIN on each query in app/db/query_plans.py against DATABASE_URL
+(after applying migrations) and exits non-zero if any of them scans a table
+or is not served by the indexes it is meant to use.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.db.migrations import upgrade_database
+from app.db.query_plans import HOT_QUERIES, check_hot_queries, explain, missing_indexes
+from app.db.session import SessionLocal
+
+def check_query_plans() -> int:
+    upgrade_database()
+    db = SessionLocal()
+    try:
+        failures = check_hot_queries(db)
+        for name, (indexes, build) in HOT_QUERIES.items():
+            plan = failures.get(name) or explain(db, build())
+            print(f"{'❌' if name in failures else '✅'} {name}")
+            for line in plan:
+                print(f"    {line}")
+            missing = missing_indexes(plan, indexes)
+            if missing:
+                print(f"    expected {', '.join(missing)}")
+    finally:
+        db.close()
+    if failures:
+        print(f"{len(failures)} hot query(s) don't use their indexes: {', '.join(failures)}")
+        return 1
+    print("All hot queries use their indexes")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(check_query_plans())
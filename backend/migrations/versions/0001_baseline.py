@@ -0,0 +1,237 @@
+"""Baseline schema
+
+Creates the schema on an empty database. Databases created before migrations
+existed (by `Base.metadata.create_all` and the old ALTER TABLE steps in
+setup_admin.py) are brought up to the same state: missing tables are
+created and missing columns, indexes and backfills are applied.
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-07-12 00:00:00
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+PENDING = sa.text("status = 'pending'")
+
+
+def tables():
+    """The schema this revision creates, frozen as of when migrations were introduced"""
+    metadata = sa.MetaData()
+    sa.Table(
+        "users", metadata,
+        sa.Column("id", sa.Integer, primary_key=True, index=True),
+        sa.Column("name", sa.String, nullable=False),
+        sa.Column("email", sa.String, unique=True, index=True, nullable=False),
+        sa.Column("password_hash", sa.String, nullable=False),
+        sa.Column("location", sa.String, nullable=True),
+        sa.Column("photo_path", sa.String, nullable=True),
+        sa.Column("availability", sa.String, nullable=True),
+        sa.Column("is_public", sa.Boolean),
+        sa.Column("is_admin", sa.Boolean),
+        sa.Column("is_banned", sa.Boolean),
+        sa.Column("created_at", sa.DateTime, nullable=True),
+        sa.Column("last_login", sa.DateTime, nullable=True),
+    )
+    sa.Table(
+        "skills", metadata,
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id")),
+        sa.Column("name", sa.String, nullable=False),
+        sa.Column("type", sa.Enum("offered", "wanted", name="skilltype"), nullable=False),
+        sa.Column("level", sa.Enum("beginner", "intermediate", "pro", name="skilllevel"), nullable=False),
+        sa.Column("status", sa.Enum("pending", "approved", "rejected", name="skillstatus")),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("moderation_priority", sa.Integer, nullable=False, server_default="1"),
+        sa.Column("moderation_reason", sa.String, nullable=True),
+        sa.Column("claimed_by", sa.Integer, nullable=True),
+        sa.Column("claim_expires_at", sa.DateTime, nullable=True),
+        sa.Index("ix_skills_status_created_at", "status", "created_at"),
+        sa.Index("ix_skills_moderation_queue", "status", "moderation_priority", "created_at", "id"),
+    )
+    sa.Table(
+        "swaps", metadata,
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("from_user_id", sa.Integer, sa.ForeignKey("users.id")),
+        sa.Column("to_user_id", sa.Integer, sa.ForeignKey("users.id")),
+        sa.Column("skill_offered_id", sa.Integer, sa.ForeignKey("skills.id")),
+        sa.Column("skill_requested_id", sa.Integer, sa.ForeignKey("skills.id")),
+        sa.Column("status", sa.Enum(
+            "pending", "accepted", "rejected", "cancelled", "completed", "expired", name="swapstatus"
+        )),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        sa.Index(
+            "uq_swaps_pending_request", "from_user_id", "to_user_id", "skill_offered_id", "skill_requested_id",
+            unique=True, sqlite_where=PENDING, postgresql_where=PENDING,
+        ),
+        sa.Index("ix_swaps_status_created_at", "status", "created_at"),
+    )
+    sa.Table(
+        "ratings", metadata,
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("swap_id", sa.Integer, sa.ForeignKey("swaps.id")),
+        sa.Column("from_user_id", sa.Integer, sa.ForeignKey("users.id")),
+        sa.Column("to_user_id", sa.Integer, sa.ForeignKey("users.id")),
+        sa.Column("stars", sa.Integer, nullable=False),
+        sa.Column("feedback", sa.String),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    sa.Table(
+        "swapcoins", metadata,
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id")),
+        sa.Column("coins", sa.Integer),
+    )
+    sa.Table(
+        "platform_messages", metadata,
+        sa.Column("id", sa.Integer, primary_key=True, index=True),
+        sa.Column("title", sa.String, nullable=False),
+        sa.Column("message", sa.Text, nullable=False),
+        sa.Column("message_type", sa.String),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("created_by", sa.Integer, nullable=True),
+        sa.Column("is_active", sa.Boolean, nullable=False, server_default=sa.true(), index=True),
+    )
+    sa.Table(
+        "user_rating_stats", metadata,
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("rating_count", sa.Integer, nullable=False),
+        sa.Column("rating_sum", sa.Integer, nullable=False),
+        *(sa.Column(f"stars_{stars}", sa.Integer, nullable=False) for stars in range(1, 6)),
+        sa.Column("bayesian_average", sa.Float, nullable=False, index=True),
+    )
+    sa.Table(
+        "platform_counters", metadata,
+        sa.Column("name", sa.String, primary_key=True),
+        sa.Column("value", sa.Integer, nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    sa.Table(
+        "report_jobs", metadata,
+        sa.Column("id", sa.String(32), primary_key=True),
+        sa.Column("params_hash", sa.String(64), nullable=False, index=True),
+        sa.Column("report_type", sa.String, nullable=False),
+        sa.Column("format", sa.String, nullable=False),
+        sa.Column("gzip", sa.Boolean),
+        sa.Column("start_date", sa.DateTime, nullable=True),
+        sa.Column("end_date", sa.DateTime, nullable=True),
+        sa.Column("status", sa.String, nullable=False),
+        sa.Column("rows_total", sa.Integer, nullable=True),
+        sa.Column("rows_written", sa.Integer),
+        sa.Column("file_path", sa.String, nullable=True),
+        sa.Column("error", sa.Text, nullable=True),
+        sa.Column("created_by", sa.Integer, nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    sa.Table(
+        "daily_rollups", metadata,
+        sa.Column("metric", sa.String, primary_key=True),
+        sa.Column("day", sa.Date, primary_key=True),
+        sa.Column("value", sa.Integer, nullable=False),
+    )
+    sa.Table(
+        "rollup_watermarks", metadata,
+        sa.Column("name", sa.String, primary_key=True),
+        sa.Column("last_day", sa.Date, nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    return metadata
+
+
+# Columns added to existing tables over time, as the old setup_admin.py added them
+LEGACY_COLUMNS = {
+    "users": [
+        sa.Column("is_banned", sa.Boolean, server_default=sa.false()),
+        sa.Column("created_at", sa.DateTime, nullable=True),
+        sa.Column("last_login", sa.DateTime, nullable=True),
+    ],
+    "skills": [
+        sa.Column("status", sa.String(20), server_default="approved"),
+        sa.Column("created_at", sa.DateTime, nullable=True),
+        sa.Column("moderation_priority", sa.Integer, nullable=False, server_default="1"),
+        sa.Column("moderation_reason", sa.String, nullable=True),
+        sa.Column("claimed_by", sa.Integer, nullable=True),
+        sa.Column("claim_expires_at", sa.DateTime, nullable=True),
+    ],
+    "swaps": [
+        sa.Column("created_at", sa.DateTime, nullable=True),
+        sa.Column("updated_at", sa.DateTime, nullable=True),
+    ],
+    "ratings": [
+        sa.Column("created_at", sa.DateTime, nullable=True),
+    ],
+}
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing = set(inspector.get_table_names())
+    metadata = tables()
+
+    for table in metadata.sorted_tables:
+        if table.name not in existing:
+            # checkfirst also skips enum types left behind by a partial schema
+            table.create(bind, checkfirst=True)
+            continue
+        columns = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in LEGACY_COLUMNS.get(table.name, []):
+            if column.name not in columns:
+                op.add_column(table.name, column.copy())
+        indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+        if table.name == "swaps" and "uq_swaps_pending_request" not in indexes:
+            _cancel_duplicate_pending_swaps()
+        for index in table.indexes:
+            if index.name not in indexes:
+                index.create(bind)
+
+    if "platform_messages" in existing:
+        _normalize_is_active(bind, inspector)
+
+    now = datetime.utcnow()
+    op.execute(sa.text("UPDATE users SET created_at = :now WHERE created_at IS NULL").bindparams(now=now))
+    op.execute(sa.text("UPDATE skills SET created_at = :now WHERE created_at IS NULL").bindparams(now=now))
+    op.execute(sa.text("UPDATE swaps SET created_at = :now WHERE created_at IS NULL").bindparams(now=now))
+
+
+def _cancel_duplicate_pending_swaps():
+    """Keep the oldest of identical pending requests so the unique index can be built"""
+    op.execute("""
+        UPDATE swaps SET status = 'cancelled'
+        WHERE status = 'pending' AND id NOT IN (
+            SELECT MIN(id) FROM swaps WHERE status = 'pending'
+            GROUP BY from_user_id, to_user_id, skill_offered_id, skill_requested_id
+        )
+    """)
+
+
+def _normalize_is_active(bind, inspector):
+    """platform_messages.is_active used to be declared as a string column"""
+    column = next(c for c in inspector.get_columns("platform_messages") if c["name"] == "is_active")
+    if bind.dialect.name == "postgresql":
+        if isinstance(column["type"], sa.Boolean):
+            return
+        op.execute("ALTER TABLE platform_messages ALTER COLUMN is_active DROP DEFAULT")
+        op.execute("""
+            ALTER TABLE platform_messages ALTER COLUMN is_active TYPE BOOLEAN
+            USING (is_active IS NULL OR lower(is_active::text) IN ('1', 't', 'true'))
+        """)
+        op.execute("ALTER TABLE platform_messages ALTER COLUMN is_active SET DEFAULT TRUE")
+    else:
+        op.execute("""
+            UPDATE platform_messages
+            SET is_active = CASE WHEN is_active IS NULL OR lower(is_active) IN ('1', 't', 'true') THEN 1 ELSE 0 END
+        """)
+
+
+def downgrade():
+    # Back to an empty database: drops every table of the baseline schema with its indexes and data
+    tables().drop_all(op.get_bind(), checkfirst=True)
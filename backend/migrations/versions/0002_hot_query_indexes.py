@@ -0,0 +1,78 @@
+"""Index the foreign keys behind the hot lookups
+
+Swaps are listed by either party and status, skills by owner and type,
+ratings by ratee and checked per (swap, rater), and coins are looked up by
+user; without these indexes every one of those queries scans its table.
+A rating per rater per swap and a coin balance per user become unique, so
+duplicates left by earlier races are removed first, keeping the oldest row.
+Removed ratings are taken out of the per-user rating stats by rebuilding
+them (the platform counters are repaired by the next reconciliation), and
+duplicate coin balances are added into the row that is kept.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-07-12 00:00:01
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.core.config import settings
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    deleted_ratings = bind.execute(sa.text("""
+        DELETE FROM ratings
+        WHERE swap_id IS NOT NULL AND from_user_id IS NOT NULL AND id NOT IN (
+            SELECT MIN(id) FROM ratings WHERE swap_id IS NOT NULL AND from_user_id IS NOT NULL
+            GROUP BY swap_id, from_user_id
+        )
+    """)).rowcount
+    if deleted_ratings:
+        _rebuild_rating_stats()
+    # The API reads the first balance row, so that is the one kept, holding the total
+    op.execute("""
+        UPDATE swapcoins
+        SET coins = (SELECT SUM(COALESCE(other.coins, 0)) FROM swapcoins other WHERE other.user_id = swapcoins.user_id)
+        WHERE id IN (SELECT MIN(id) FROM swapcoins WHERE user_id IS NOT NULL GROUP BY user_id HAVING COUNT(*) > 1)
+    """)
+    op.execute("""
+        DELETE FROM swapcoins
+        WHERE user_id IS NOT NULL AND id NOT IN (
+            SELECT MIN(id) FROM swapcoins WHERE user_id IS NOT NULL GROUP BY user_id
+        )
+    """)
+
+    op.create_index("ix_swaps_from_user_id_status", "swaps", ["from_user_id", "status"])
+    op.create_index("ix_swaps_to_user_id_status", "swaps", ["to_user_id", "status"])
+    op.create_index("ix_skills_user_id_type", "skills", ["user_id", "type"])
+    op.create_index("ix_ratings_to_user_id", "ratings", ["to_user_id"])
+    op.create_index("uq_ratings_swap_id_from_user_id", "ratings", ["swap_id", "from_user_id"], unique=True)
+    op.create_index("uq_swapcoins_user_id", "swapcoins", ["user_id"], unique=True)
+
+
+def _rebuild_rating_stats():
+    """Recompute user_rating_stats from the remaining ratings, as app.services.ratings.rebuild_rating_stats does"""
+    histogram = ", ".join(f"SUM(CASE WHEN stars = {n} THEN 1 ELSE 0 END)" for n in range(1, 6))
+    op.execute("DELETE FROM user_rating_stats")
+    op.get_bind().execute(sa.text(f"""
+        INSERT INTO user_rating_stats
+            (user_id, rating_count, rating_sum, stars_1, stars_2, stars_3, stars_4, stars_5, bayesian_average)
+        SELECT to_user_id, COUNT(id), SUM(stars), {histogram},
+               (:prior_weight * :prior_mean + SUM(stars)) / (:prior_weight + COUNT(id))
+        FROM ratings WHERE to_user_id IS NOT NULL
+        GROUP BY to_user_id
+    """).bindparams(prior_weight=float(settings.RATING_PRIOR_WEIGHT), prior_mean=float(settings.RATING_PRIOR_MEAN)))
+
+
+def downgrade():
+    op.drop_index("uq_swapcoins_user_id", table_name="swapcoins")
+    op.drop_index("uq_ratings_swap_id_from_user_id", table_name="ratings")
+    op.drop_index("ix_ratings_to_user_id", table_name="ratings")
+    op.drop_index("ix_skills_user_id_type", table_name="skills")
+    op.drop_index("ix_swaps_to_user_id_status", table_name="swaps")
+    op.drop_index("ix_swaps_from_user_id_status", table_name="swaps")
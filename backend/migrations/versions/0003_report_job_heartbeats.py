@@ -0,0 +1,42 @@
+"""Keep report job state on the row so every worker sees it
+
+Jobs get a heartbeat column refreshed by the worker holding them, and at
+most one queued or running job may exist per set of report parameters.
+Duplicate active jobs left by earlier races are failed first, keeping one
+of each.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-07-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+ACTIVE = "status IN ('queued', 'running')"
+
+
+def upgrade():
+    op.add_column("report_jobs", sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True))
+    op.execute(f"""
+        UPDATE report_jobs SET status = 'failed', error = 'Duplicate of an identical job'
+        WHERE {ACTIVE} AND id NOT IN (
+            SELECT id FROM (
+                SELECT MIN(id) AS id FROM report_jobs WHERE {ACTIVE} GROUP BY params_hash
+            ) AS kept
+        )
+    """)
+    op.create_index(
+        "uq_report_jobs_active_params_hash", "report_jobs", ["params_hash"], unique=True,
+        sqlite_where=sa.text(ACTIVE), postgresql_where=sa.text(ACTIVE),
+    )
+
+
+def downgrade():
+    op.drop_index("uq_report_jobs_active_params_hash", table_name="report_jobs")
+    with op.batch_alter_table("report_jobs") as batch:
+        batch.drop_column("heartbeat_at")
@@ -0,0 +1,35 @@
+"""Record when each swap entered each status
+
+Rollups counted status changes by the swap's current status and
+updated_at, so a swap accepted and later completed was never counted as
+accepted. Each later status now has its own timestamp column. Existing swaps
+get the one for their current status from updated_at; earlier transitions
+were not recorded and stay empty. The rollup watermark is cleared so every
+day is aggregated again from the new columns.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-07-19 00:00:01
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+STATUSES = ("accepted", "rejected", "completed", "cancelled", "expired")
+
+
+def upgrade():
+    for status in STATUSES:
+        op.add_column("swaps", sa.Column(f"{status}_at", sa.DateTime(timezone=True), nullable=True))
+        op.execute(f"UPDATE swaps SET {status}_at = COALESCE(updated_at, created_at) WHERE status = '{status}'")
+    op.execute("DELETE FROM rollup_watermarks")
+
+
+def downgrade():
+    with op.batch_alter_table("swaps") as batch:
+        for status in STATUSES:
+            batch.drop_column(f"{status}_at")
@@ -0,0 +1,40 @@
+"""Let per-user lookups by status seek on the user
+
+A user's swaps in a status and the approved skills of a page of users were
+planned on the (status, created_at) indexes, reading every swap or skill in
+that status. Skills get a (user_id, status) index. The swap sweeper's
+(status, created_at) index is replaced by partial indexes on created_at for
+the two statuses it expires, which per-user lookups cannot pick instead of
+the (user_id, status) indexes.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-07-26 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+SWEPT_STATUSES = ("pending", "accepted")
+
+
+def upgrade():
+    op.create_index("ix_skills_user_id_status", "skills", ["user_id", "status"])
+    for status in SWEPT_STATUSES:
+        where = sa.text(f"status = '{status}'")
+        op.create_index(
+            f"ix_swaps_{status}_created_at", "swaps", ["created_at"],
+            sqlite_where=where, postgresql_where=where,
+        )
+    op.drop_index("ix_swaps_status_created_at", table_name="swaps")
+
+
+def downgrade():
+    op.create_index("ix_swaps_status_created_at", "swaps", ["status", "created_at"])
+    for status in SWEPT_STATUSES:
+        op.drop_index(f"ix_swaps_{status}_created_at", table_name="swaps")
+    op.drop_index("ix_skills_user_id_status", table_name="skills")
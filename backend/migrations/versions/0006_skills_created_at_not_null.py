@@ -0,0 +1,30 @@
+"""Make skills.created_at required
+
+The moderation queue pages on (moderation_priority, created_at, id); a skill
+without created_at dropped out of the keyset comparison and, last on a page,
+produced a cursor that could not be decoded. Skills still missing it are
+given the time of the migration, as the baseline did.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-07-26 00:00:01
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(sa.text("UPDATE skills SET created_at = :now WHERE created_at IS NULL").bindparams(now=datetime.utcnow()))
+    with op.batch_alter_table("skills") as batch:
+        batch.alter_column("created_at", existing_type=sa.DateTime(timezone=True), nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table("skills") as batch:
+        batch.alter_column("created_at", existing_type=sa.DateTime(timezone=True), nullable=True)
@@ -0,0 +1,36 @@
+"""Index accepted swaps by when they were accepted
+
+The stale swap sweeper expired accepted swaps by created_at, so a swap
+accepted near the end of its TTL expired almost at once. It now ages them
+from accepted_at, falling back to created_at for swaps accepted before that
+column existed, and the partial index on accepted swaps follows.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2025-07-26 00:00:02
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+ACCEPTED = sa.text("status = 'accepted'")
+
+
+def upgrade():
+    op.create_index(
+        "ix_swaps_accepted_since", "swaps", [sa.text("coalesce(accepted_at, created_at)")],
+        sqlite_where=ACCEPTED, postgresql_where=ACCEPTED,
+    )
+    op.drop_index("ix_swaps_accepted_created_at", table_name="swaps")
+
+
+def downgrade():
+    op.create_index(
+        "ix_swaps_accepted_created_at", "swaps", ["created_at"],
+        sqlite_where=ACCEPTED, postgresql_where=ACCEPTED,
+    )
+    op.drop_index("ix_swaps_accepted_since", table_name="swaps")
@@ -6,68 +6,33 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from app.db.migrations import upgrade_database
 from app.db.session import SessionLocal
 from app.models import User
+from app.services.counters import reconcile_counters
+from app.services.ratings import rebuild_rating_stats
+from app.services.rollups import run_rollups
 from app.core.security import get_password_hash
-from sqlalchemy import text
 
 def setup_admin():
     """Set up admin user and update database schema"""
     db = SessionLocal()
     
     try:
-        # Update database schema first - add new columns if they don't exist
+        # Bring the schema up to date first; see migrations/versions
         print("Updating database schema...")
-        
-        # Add new columns if they don't exist
-        try:
-            db.execute(text("ALTER TABLE users ADD COLUMN is_banned BOOLEAN DEFAULT FALSE"))
-            print("Added is_banned column to users table")
-        except Exception as e:
-            print(f"is_banned column might already exist: {e}")
-        
-        try:
-            db.execute(text("ALTER TABLE users ADD COLUMN created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP"))
-            print("Added created_at column to users table")
-        except Exception as e:
-            print(f"created_at column might already exist: {e}")
-        
-        try:
-            db.execute(text("ALTER TABLE users ADD COLUMN last_login TIMESTAMP NULL"))
-            print("Added last_login column to users table")
-        except Exception as e:
-            print(f"last_login column might already exist: {e}")
-        
-        try:
-            db.execute(text("ALTER TABLE skills ADD COLUMN status VARCHAR(20) DEFAULT 'approved'"))
-            print("Added status column to skills table")
-        except Exception as e:
-            print(f"status column might already exist: {e}")
-        
-        try:
-            db.execute(text("ALTER TABLE skills ADD COLUMN created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP"))
-            print("Added created_at column to skills table")
-        except Exception as e:
-            print(f"created_at column might already exist: {e}")
-        
-        # Create platform_messages table
-        try:
-            db.execute(text("""
-                CREATE TABLE platform_messages (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title VARCHAR NOT NULL,
-                    message TEXT NOT NULL,
-                    message_type VARCHAR DEFAULT 'info',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    created_by INTEGER,
-                    is_active BOOLEAN DEFAULT TRUE
-                )
-            """))
-            print("Created platform_messages table")
-        except Exception as e:
-            print(f"platform_messages table might already exist: {e}")
-        
-        db.commit()
+        upgrade_database()
+
+        # Running rating aggregates
+        rebuilt = rebuild_rating_stats(db)
+        print(f"Rebuilt rating aggregates for {rebuilt} users")
+
+        # Platform counters, seeded from the current tables
+        drift = reconcile_counters(db)
+        print(f"Reconciled platform counters ({len(drift)} corrected)")
+
+        # Daily analytics rollups, backfilled up to yesterday
+        print(f"Rolled up {run_rollups(db)} day(s) of activity")
         
         # Now check if admin user already exists
         try: